@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+# pysap - Python library for crafting SAP's network protocols packets
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# Author:
+#   Martin Gallo (@martingalloar)
+#   Code contributed by SecureAuth to the OWASP CBAS project
+#
+
+# Standard imports
+from glob import glob
+from os import path
+from binascii import unhexlify
+from argparse import ArgumentParser
+# External imports
+import pysapcompress
+# Custom imports
+import pysap
+
+
+# Command line options parser
+def parse_options():
+
+    description = "This script can be used to train a pysapcompress module built with 'setup.py build_ext " \
+                  "--pgo-generate=<dir>'. It (de)compresses a corpus of SAP payloads, so the profile written " \
+                  "to the directory can be used afterwards with 'setup.py build_ext --pgo-use=<dir> --force'."
+
+    usage = "%(prog)s [options]"
+
+    parser = ArgumentParser(usage=usage, description=description, epilog=pysap.epilog)
+    parser.add_argument("-d", "--data", dest="data_dir",
+                        default=path.join(path.dirname(__file__), "..", "tests", "data"),
+                        help="Directory with the hex encoded '*_decompressed.data' payloads [%(default)s]")
+    parser.add_argument("-n", "--iterations", dest="iterations", type=int, default=200,
+                        help="Number of times to (de)compress each payload [%(default)d]")
+
+    options = parser.parse_args()
+
+    return options
+
+
+def read_payloads(data_dir):
+    """Reads the hex encoded payloads found in a data directory, in the same
+    format used by the test suite."""
+    payloads = []
+    for filename in sorted(glob(path.join(data_dir, "*_decompressed.data"))):
+        with open(filename, "rb") as fd:
+            payloads.append(unhexlify(fd.read().replace(b"\n", b"").replace(b" ", b"")))
+    return payloads
+
+
+def train(payloads, iterations):
+    """Compresses and decompresses each payload with both algorithms."""
+    for payload in payloads:
+        for algorithm in (pysapcompress.ALG_LZH, pysapcompress.ALG_LZC):
+            _, _, compressed = pysapcompress.compress(payload, algorithm)
+            for _ in range(iterations):
+                pysapcompress.decompress(compressed, len(payload))
+            for _ in range(max(iterations // 10, 1)):
+                pysapcompress.compress(payload, algorithm)
+
+
+if __name__ == "__main__":
+    options = parse_options()
+
+    payloads = read_payloads(options.data_dir)
+    if not payloads:
+        raise SystemExit("No payloads found in {}".format(options.data_dir))
+
+    train(payloads, options.iterations)
+    print("Trained with {} payloads".format(len(payloads)))
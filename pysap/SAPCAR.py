@@ -31,8 +31,8 @@ from scapy.fields import (ByteField, ByteEnumField, LEIntField, FieldLenField,
                           ConditionalField, LESignedIntField, StrField, LELongField)
 # Custom imports
 from pysap.utils.fields import (PacketNoPadded, StrNullFixedLenField, PacketListStopField)
-from pysapcompress import (decompress, compress, ALG_LZH, CompressError,
-                           DecompressError)
+from pysapcompress import (decompress, decompress_many, compress, ALG_LZH,
+                           CompressError, DecompressError)
 
 
 SIZE_FOUR_GB = 0xffffffff + 1
@@ -106,6 +106,24 @@ def sapcar_is_last_block(packet):
     return packet.type in [SAPCAR_BLOCK_TYPE_COMPRESSED_LAST, SAPCAR_BLOCK_TYPE_UNCOMPRESSED_LAST]
 
 
+def sapcar_check_decompressed(block_length, block_buffer, exp_length):
+    """Helper function that checks the result of decompressing the blocks of a file.
+
+    :param block_length: length of the decompressed data
+    :type block_length: int
+
+    :param block_buffer: decompressed data
+    :type block_buffer: bytes
+
+    :param exp_length: expected length of the decompressed data
+    :type exp_length: int
+
+    :raise DecompressError: If the decompressed data is not the expected one
+    """
+    if block_length != exp_length or not block_buffer:
+        raise DecompressError("Error decompressing block")
+
+
 SAPCAR_TYPE_FILE = b"RG"
 """SAP CAR regular file string"""
 
@@ -173,57 +191,70 @@ class SAPCARArchiveFilev200Format(PacketNoPadded):
         self.file_length_low = file_length & 0xffffffff
         self.file_length_high = file_length >> 32
 
-    def extract(self, fd):
-        """Extracts the archive file and writes the extracted file to the provided file object. Returns the checksum
-        obtained from the archive. If blocks are uncompressed, the file is directly extracted. If the blocks are
-        compressed, each block is added to a buffer, skipping the length field, and decompression is performed after
-        the block marked as end of data. Expected length and compression header is obtained from the first block and
+    def extract_blocks(self):
+        """Collects the content of the blocks of the archive file without decompressing it. Uncompressed blocks are
+        joined together, and compressed blocks are added to a buffer, skipping the length field, until the block
+        marked as end of data. Expected length and compression header is obtained from the first block and
         checksum from the end of data block.
 
-        :param fd: file-like object to write the extracted file to
-        :type fd: file
-
-        :return: checksum
-        :rtype: int
+        :return: uncompressed data, compressed data, expected length of the decompressed data and checksum
+        :rtype: tuple of bytes, bytes, int, int
 
-        :raise DecompressError: If there's a decompression error
         :raise SAPCARInvalidFileException: If the file is invalid
         """
 
         if self.file_length == 0:
-            return 0
+            return b"", b"", None, 0
 
-        compressed = b""
+        uncompressed = []
+        compressed = []
         checksum = 0
         exp_length = None
 
-        remaining_length = self.file_length
         for block in self.blocks:
             # Process uncompressed block types
             if block.type in [SAPCAR_BLOCK_TYPE_UNCOMPRESSED, SAPCAR_BLOCK_TYPE_UNCOMPRESSED_LAST]:
-                fd.write(block.compressed)
-                remaining_length -= len(block.compressed)
+                uncompressed.append(bytes(block.compressed))
             # Store compressed block types for later decompression
             elif block.type in [SAPCAR_BLOCK_TYPE_COMPRESSED, SAPCAR_BLOCK_TYPE_COMPRESSED_LAST]:
                 # Add compressed block to a buffer, skipping the first 4 bytes of each block (uncompressed length)
-                compressed += bytes(block.compressed)[4:]
+                compressed.append(bytes(block.compressed)[4:])
                 # If the expected length wasn't already set, do it
                 if not exp_length:
                     exp_length = block.compressed.uncompress_length
             else:
                 raise SAPCARInvalidFileException("Invalid block type found")
 
-            # Check end of data block, performing decompression if needed
+            # Check end of data block
             if sapcar_is_last_block(block):
                 checksum = block.checksum
-                # If there was at least one compressed block that set the expected length, decompress it
-                if exp_length:
-                    (_, block_length, block_buffer) = decompress(bytes(compressed), exp_length)
-                    if block_length != exp_length or not block_buffer:
-                        raise DecompressError("Error decompressing block")
-                    fd.write(block_buffer)
                 break
 
+        return b"".join(uncompressed), b"".join(compressed), exp_length, checksum
+
+    def extract(self, fd):
+        """Extracts the archive file and writes the extracted file to the provided file object. Returns the checksum
+        obtained from the archive. If blocks are uncompressed, the file is directly extracted. If the blocks are
+        compressed, decompression is performed after collecting the block marked as end of data.
+
+        :param fd: file-like object to write the extracted file to
+        :type fd: file
+
+        :return: checksum
+        :rtype: int
+
+        :raise DecompressError: If there's a decompression error
+        :raise SAPCARInvalidFileException: If the file is invalid
+        """
+        uncompressed, compressed, exp_length, checksum = self.extract_blocks()
+        fd.write(uncompressed)
+
+        # If there was at least one compressed block that set the expected length, decompress it
+        if exp_length:
+            (_, block_length, block_buffer) = decompress(compressed, exp_length)
+            sapcar_check_decompressed(block_length, block_buffer, exp_length)
+            fd.write(block_buffer)
+
         return checksum
 
 
@@ -578,6 +609,26 @@ class SAPCARArchiveFile(object):
         # Extract the file to a file-like object
         out_file = BytesIO()
         checksum = self._file_format.extract(out_file)
+        return self._open_extracted(out_file, checksum, enforce_checksum)
+
+    def _open_extracted(self, out_file, checksum, enforce_checksum):
+        """Rewinds the file-like object the file was extracted to and validates
+        its checksum if required.
+
+        :param out_file: file-like object with the uncompressed file content
+        :type out_file: file
+
+        :param checksum: checksum obtained from the archive
+        :type checksum: int
+
+        :param enforce_checksum: If the checksum validation should be enforce
+        :type enforce_checksum: bool
+
+        :return: file-like object with the uncompressed file content
+        :rtype: file
+
+        :raise SAPCARInvalidChecksumException: If the checksum is invalid
+        """
         out_file.seek(0)
 
         # Validate the checksum if required
@@ -605,6 +656,9 @@ class SAPCARArchive(object):
     """Proxy class that can be used to read SAP CAR archive files.
     """
 
+    DECOMPRESS_BATCH_LENGTH = 64 * 1024 * 1024
+    """Default maximum decompressed length of the batches of files opened together"""
+
     # Instance attributes
     filename = None
     fd = None
@@ -782,6 +836,95 @@ class SAPCARArchive(object):
             raise Exception("Invalid filename")
         return self.files[filename].open()
 
+    def open_files(self, filenames=None, enforce_checksum=False, batch_length=None):
+        """Opens several files inside the SAP CAR archive and returns an iterator over
+        file-like objects that can be used to access them. The compressed files are
+        decompressed in batches with a single call each, in parallel if pysapcompress
+        was built with OpenMP. Batches are bounded by the decompressed length of their
+        files, so only a batch of files is held in memory at a time.
+
+        Errors found when opening a file don't stop the iteration, and the exception
+        raised when opening it is returned in place of its file-like object.
+
+        :param filenames: names of the files to open, all the regular files if not provided
+        :type filenames: list of string
+
+        :param enforce_checksum: If the checksum validation should be enforce
+        :type enforce_checksum: bool
+
+        :param batch_length: maximum decompressed length of a batch of files, files larger
+            than it are decompressed on their own. Defaults to :attr:`DECOMPRESS_BATCH_LENGTH`.
+        :type batch_length: int
+
+        :return: iterator over file names and file-like objects that can be used to access
+            the decompressed files, or the exception raised when opening them
+        :rtype: iterator of tuple of string, file or Exception
+
+        :raise Exception: If a file to open is not found or is a directory
+        """
+        files = self.files
+        if filenames is None:
+            filenames = [filename for filename, fil in files.items() if fil.is_file()]
+
+        for filename in filenames:
+            if filename not in files:
+                raise Exception("Invalid filename")
+            if files[filename].is_directory():
+                raise Exception("Invalid file type")
+
+        return self._open_files([(filename, files[filename]) for filename in filenames], enforce_checksum,
+                                batch_length or self.DECOMPRESS_BATCH_LENGTH)
+
+    def _open_files(self, files, enforce_checksum, batch_length):
+        """Generator opening the files in batches for :meth:`open_files`.
+        """
+        batch = []
+        batch_exp_length = 0
+        for filename, fil in files:
+            try:
+                extracted = fil._file_format.extract_blocks()
+            except SAPCARInvalidFileException as e:
+                extracted = e
+            else:
+                batch_exp_length += extracted[2] or 0
+            batch.append((filename, fil, extracted))
+
+            if batch_exp_length >= batch_length:
+                for opened in self._open_batch(batch, enforce_checksum):
+                    yield opened
+                batch = []
+                batch_exp_length = 0
+
+        for opened in self._open_batch(batch, enforce_checksum):
+            yield opened
+
+    @staticmethod
+    def _open_batch(batch, enforce_checksum):
+        """Decompresses a batch of extracted files with a single call and returns their
+        file-like objects, or the exception raised when opening them.
+        """
+        # Decompress all the compressed files of the batch at once
+        decompressed = iter(decompress_many([(extracted[1], extracted[2]) for _, _, extracted in batch
+                                             if not isinstance(extracted, Exception) and extracted[2]]))
+
+        opened = []
+        for filename, fil, extracted in batch:
+            if isinstance(extracted, Exception):
+                opened.append((filename, extracted))
+                continue
+            uncompressed, _, exp_length, checksum = extracted
+            try:
+                out_file = BytesIO()
+                out_file.write(uncompressed)
+                if exp_length:
+                    (_, block_length, block_buffer) = next(decompressed)
+                    sapcar_check_decompressed(block_length, block_buffer, exp_length)
+                    out_file.write(block_buffer)
+                opened.append((filename, fil._open_extracted(out_file, checksum, enforce_checksum)))
+            except (DecompressError, SAPCARInvalidChecksumException) as e:
+                opened.append((filename, e))
+        return opened
+
     def close(self):
         """Close the file descriptor object associated to the archive file.
         """
@@ -18,11 +18,16 @@
 
 # Standard imports
 import ssl
+import hmac
+import asyncio
+import functools
 import socket
 import struct
+import logging
+from collections import OrderedDict
 # External imports
-from cryptography.hazmat.backends import default_backend
 from scapy.layers.inet import TCP
+from scapy.compat import bytes_encode
 from scapy.packet import Packet, bind_layers, Raw
 from scapy.supersocket import SSLStreamSocket
 from scapy.fields import (ByteField, ConditionalField, EnumField, FieldLenField, YesNoByteField,
@@ -33,7 +38,11 @@ import pysap
 from pysap.SAPRouter import SAPRoutedStreamSocket
 from pysap.utils.crypto import SCRAM_SHA256, SCRAM_PBKDF2SHA256
 from pysap.utils.fields import (PacketNoPadded, AdjustableFieldLenField, LESignedByteField,
-                                LESignedShortField, LESignedLongField)
+                                LESignedShortField, LESignedLongField, LazyPacketListField)
+
+
+# Create a logger for the SAPHDB layer
+log_saphdb = logging.getLogger("pysap.saphdb")
 
 
 hdb_packetoptions_values = {
@@ -359,6 +368,22 @@ class SAPHDBOptionPartRow(PacketNoPadded):
         ),
     ]
 
+    _fields_cache = {}
+    """Default values and field types of each option part row class"""
+
+    def init_fields(self):
+        """Initializes the fields from a per-class cache. Scapy doesn't cache the fields of packets containing
+        a :class:`MultipleTypeField` and computes them again for every row, but the default value of the
+        `value` field is always `None`, so they're computed once per class as Scapy does with other packets.
+        """
+        cached_fields = self._fields_cache.get(self.__class__)
+        if cached_fields is None:
+            cached_fields = ({f.name: f.default for f in self.fields_desc},
+                             {f.name: f for f in self.fields_desc},
+                             [f for f in self.fields_desc if f.holds_packets])
+            self._fields_cache[self.__class__] = cached_fields
+        self.default_fields, self.fieldtype, self.packetfields = cached_fields
+
 
 class SAPHDBMultiLineOptionPartRow(PacketNoPadded):
     """SAP HANA SQL Command Network Protocol Multi-line Option Part
@@ -719,6 +744,69 @@ class SAPHDBPartAuthentication(PacketNoPadded):
     ]
 
 
+def hdb_auth_field_bytes(value):
+    """Serializes a value as an Authentication Field. The length is encoded in the same
+    way :class:`AdjustableFieldLenField` does, so the output matches the one obtained
+    when building a :class:`SAPHDBPartAuthenticationField` packet.
+
+    :param value: value of the field
+    :type value: string, bytes or :class:`Packet`
+
+    :return: the serialized Authentication Field
+    :rtype: bytes
+    """
+    value = bytes_encode(value)
+    length = len(value)
+    if length > 0xf0:
+        return b"\xff" + struct.pack(">H", length) + value
+    return struct.pack("B", length) + value
+
+
+hdb_auth_count_struct = struct.Struct("<H")
+"""SAP HDB Authentication Part count of fields"""
+
+hdb_auth_length_struct = struct.Struct("B")
+"""SAP HDB Authentication Field length"""
+
+hdb_auth_long_length_struct = struct.Struct(">H")
+"""SAP HDB Authentication Field long length, following the 0xff marker"""
+
+
+def hdb_parse_auth_fields(buf):
+    """Parses the values of an Authentication Part without building :class:`SAPHDBPartAuthenticationField`
+    packets. The field lengths are decoded in the same way :class:`AdjustableFieldLenField` does, and the
+    values are returned as views over the single buffer received, so no bytes are copied.
+
+    :param buf: raw Authentication Part, starting with the count of fields
+    :type buf: bytes or memoryview
+
+    :return: the values of the fields
+    :rtype: list of memoryview
+    """
+    if isinstance(buf, str):
+        buf = buf.encode()
+    buf = memoryview(buf)
+    end = len(buf)
+    if end < 2:
+        return []
+    count, = hdb_auth_count_struct.unpack_from(buf)
+
+    values = []
+    offset = 2
+    while count > 0 and offset < end:
+        length, = hdb_auth_length_struct.unpack_from(buf, offset)
+        offset += 1
+        if length == 0xff:
+            if offset + 2 > end:
+                break
+            length, = hdb_auth_long_length_struct.unpack_from(buf, offset)
+            offset += 2
+        values.append(buf[offset:offset + length])
+        offset += length
+        count -= 1
+    return values
+
+
 def saphdb_determine_part_class(pkt, lst, cur, remain):
     """Determines the class of the buffer elements based on the Part Kind value.
     """
@@ -727,6 +815,47 @@ def saphdb_determine_part_class(pkt, lst, cur, remain):
     return Raw
 
 
+def hdb_part_length(s, offset=0):
+    """Returns the length of a Part from its raw bytes: the 16 bytes of the header plus the buffer,
+    padded to 8 bytes.
+
+    :param s: raw bytes containing the part
+    :type s: bytes
+
+    :param offset: offset where the part starts
+    :type offset: int
+
+    :return: length of the part
+    :rtype: int
+
+    :raises ValueError: if the buffer length is negative
+    """
+    bufferlength, = struct.unpack_from("<i", s, offset + 8)
+    if bufferlength < 0:
+        raise ValueError("Invalid part buffer length {}".format(bufferlength))
+    return 16 + bufferlength + (-bufferlength & 7)
+
+
+def hdb_segment_length(s):
+    """Returns the length of a Segment from its raw bytes: the 24 bytes of the header plus each of the
+    parts. Parts' lengths are obtained from their headers instead of using the segment length field,
+    so the result matches the bytes consumed when dissecting the segment.
+
+    :param s: raw bytes starting with the segment
+    :type s: bytes
+
+    :return: length of the segment
+    :rtype: int
+
+    :raises ValueError: if the buffer length of a part is negative
+    """
+    noofparts, = struct.unpack_from("<h", s, 8)
+    length = 24
+    for _ in range(noofparts):
+        length += hdb_part_length(s, length)
+    return length
+
+
 class SAPHDBPart(PacketNoPadded):
     """SAP HANA SQL Command Network Protocol Part
 
@@ -772,7 +901,7 @@ class SAPHDBSegment(PacketNoPadded):
         ConditionalField(EnumField("functioncode", 0, hdb_function_code_values, fmt="<h"), hdb_segment_is_reply),
         ConditionalField(LongField("reserved3", 0), hdb_segment_is_reply),
         ConditionalField(StrFixedLenField("reserved4", None, 11), lambda pkt: not (hdb_segment_is_reply(pkt) or hdb_segment_is_request(pkt))),
-        PacketListField("parts", None, SAPHDBPart, count_from=lambda x: x.noofparts),
+        LazyPacketListField("parts", None, SAPHDBPart, count_from=lambda x: x.noofparts, size_from=hdb_part_length),
     ]
 
 
@@ -794,10 +923,90 @@ class SAPHDB(Packet):
         ByteField("reserved1", None),
         LEIntField("compressionvarpartlength", 0),
         IntField("reserved2", None),
-        PacketListField("segments", None, SAPHDBSegment, count_from=lambda x: x.noofsegm),
+        LazyPacketListField("segments", None, SAPHDBSegment, count_from=lambda x: x.noofsegm,
+                            size_from=hdb_segment_length),
     ]
 
 
+hdb_header_struct = struct.Struct("<qiIIhbBII")
+"""SAP HDB packet header layout (see :class:`SAPHDB`), used to frame packets without dissecting them"""
+
+
+def hdb_split_packets(data):
+    """Splits a buffer containing consecutive HDB packets, for example the reassembled client or server
+    side of a captured stream, into the raw bytes of each packet. Only the header of each packet is
+    parsed to obtain its length, so packets can be filtered before dissecting them with :class:`SAPHDB`.
+
+    Trailing data not containing a complete packet is ignored.
+
+    :param data: buffer containing the packets
+    :type data: bytes
+
+    :return: raw bytes of each packet found
+    :rtype: iterator of bytes
+    """
+    view = memoryview(data)
+    offset = 0
+    while offset + hdb_header_struct.size <= len(view):
+        varpartlength = hdb_header_struct.unpack_from(view, offset)[2]
+        end = offset + hdb_header_struct.size + varpartlength
+        if end > len(view):
+            break
+        yield bytes(view[offset:end])
+        offset = end
+
+
+hdb_request_segment_header_struct = struct.Struct("<iihhbbbb8x")
+"""SAP HDB request segment header layout (see :class:`SAPHDBSegment`)"""
+
+hdb_part_header_struct = struct.Struct("<bbhiii")
+"""SAP HDB part header layout (see :class:`SAPHDBPart`)"""
+
+
+hdb_option_row_string_header_struct = struct.Struct("<bbh")
+"""SAP HDB option part row header layout for string values (see :class:`SAPHDBOptionPartRow`)"""
+
+
+def hdb_build_part(partkind, buffer, argumentcount=1):
+    """Builds the raw bytes of a Part with the given buffer, without going through :class:`SAPHDBPart`.
+    The output matches the one obtained when building the packet with default values.
+
+    :param partkind: part kind
+    :type partkind: int
+
+    :param buffer: raw buffer of the part
+    :type buffer: bytes
+
+    :param argumentcount: number of arguments in the buffer
+    :type argumentcount: int
+
+    :return: the part raw bytes, including the padding to 8 bytes
+    :rtype: bytes
+    """
+    length = len(buffer)
+    return b"".join([hdb_part_header_struct.pack(partkind, 0, argumentcount, 0, length, 2**17 - 32 - 24),
+                     buffer, b"\x00" * (-length & 7)])
+
+
+def hdb_build_request(messagetype, parts):
+    """Builds the raw bytes of a request packet with a single segment containing the given parts,
+    without going through :class:`SAPHDB`.
+
+    :param messagetype: message type of the segment
+    :type messagetype: int
+
+    :param parts: raw bytes of the parts (see :func:`hdb_build_part`)
+    :type parts: list of bytes
+
+    :return: the packet raw bytes
+    :rtype: bytes
+    """
+    segmentlength = hdb_request_segment_header_struct.size + sum(len(part) for part in parts)
+    return b"".join([hdb_header_struct.pack(-1, 0, segmentlength, 2**17 - 32, 1, 0, 0, 0, 0),
+                     hdb_request_segment_header_struct.pack(segmentlength, 0, len(parts), 1, 1, messagetype, 0, 0)]
+                    + parts)
+
+
 class SAPHDBInitializationRequest(Packet):
     """SAP HANA SQL Command Network Protocol Initialization Request packet
 
@@ -805,10 +1014,14 @@ class SAPHDBInitializationRequest(Packet):
     """
     name = "SAP HANA SQL Command Network Protocol Initialization Request"
     fields_desc = [
-        StrFixedLenField("initialization", "\xff\xff\xff\xff\x04\x20\x00\x04\x01\x00\x00\x01\x01\x01", 14),
+        StrFixedLenField("initialization", b"\xff\xff\xff\xff\x04\x20\x00\x04\x01\x00\x00\x01\x01\x01", 14),
     ]
 
 
+hdb_initialization_request = b"\xff\xff\xff\xff\x04\x20\x00\x04\x01\x00\x00\x01\x01\x01"
+"""SAP HDB Initialization Request, as sent by the connections"""
+
+
 class SAPHDBInitializationReply(Packet):
     """SAP HANA SQL Command Network Protocol Initialization Reply packet
 
@@ -837,6 +1050,8 @@ class SAPHDBAuthMethod(object):
 
     METHOD = None
 
+    __slots__ = ["_username", "_username_field", "_method_field", "session_cookie"]
+
     def __init__(self, username):
         """Initialize the authentication method.
 
@@ -849,6 +1064,46 @@ class SAPHDBAuthMethod(object):
         self.username = username
         self.session_cookie = None
 
+    @property
+    def username(self):
+        """The username to include in the `AUTHENTICATION` Parts.
+
+        The username and method Authentication Fields are the same for every request crafted
+        by the method, so they're serialized once when the username is set.
+        """
+        return self._username
+
+    @username.setter
+    def username(self, username):
+        self._username = username
+        self._username_field = hdb_auth_field_bytes(username)
+        self._method_field = hdb_auth_field_bytes(self.METHOD or "")
+
+    def is_method(self, value):
+        """Returns if the method name replied by the server matches the one of the authentication method.
+        The comparison is performed in constant time.
+
+        :param value: method name to check
+        :type value: bytes
+
+        :return: if the method name matches
+        :rtype: bool
+        """
+        return hmac.compare_digest(bytes_encode(self.METHOD or ""), bytes_encode(value))
+
+    def craft_authentication_fields(self, value=None):
+        """Serializes the Authentication Fields sent by the method (username, method
+        and the given value) using the cached username and method fields.
+
+        :param value: value to include as the last field
+        :type value: string
+
+        :return: the serialized :class:`SAPHDBPartAuthentication` packet
+        :rtype: bytes
+        """
+        return b"".join([b"\x03\x00", self._username_field, self._method_field,
+                         hdb_auth_field_bytes(value or "")])
+
     def craft_authentication_request(self, value=None, connection=None):
         """Craft the initial authentication request and returns the packet to send. If a connection is
         provided, it will include the Client Context part from it (e.g. application name).
@@ -862,16 +1117,11 @@ class SAPHDBAuthMethod(object):
         :return: the initial authentication request
         :rtype: :class:`SAPHDB`
         """
-        auth_fields = SAPHDBPartAuthentication(auth_fields=[SAPHDBPartAuthenticationField(value=self.username),
-                                                            SAPHDBPartAuthenticationField(value=self.METHOD),
-                                                            SAPHDBPartAuthenticationField(value=value or "")])
-        auth_part = SAPHDBPart(partkind=33, argumentcount=1, buffer=auth_fields)
-        auth_segm = SAPHDBSegment(messagetype=65, parts=[auth_part])
-
+        parts = [hdb_build_part(33, self.craft_authentication_fields(value))]
         if connection:
-            auth_segm.parts.insert(0, connection.craft_client_context_part())
+            parts.insert(0, connection.craft_client_context_part_raw())
 
-        return SAPHDB(segments=[auth_segm])
+        return SAPHDB(hdb_build_request(65, parts))
 
     def craft_authentication_response_part(self, auth_response_part, value=None):
         """Craft the `AUTHENTICATION` Part to use as response during the authentication process.
@@ -885,9 +1135,7 @@ class SAPHDBAuthMethod(object):
         :return: the authentication response part
         :rtype: :class:`SAPHDBPart`
         """
-        auth_fields = SAPHDBPartAuthentication(auth_fields=[SAPHDBPartAuthenticationField(value=self.username),
-                                                            SAPHDBPartAuthenticationField(value=self.METHOD),
-                                                            SAPHDBPartAuthenticationField(value=value or "")])
+        auth_fields = Raw(self.craft_authentication_fields(value))
         return SAPHDBPart(partkind=33, argumentcount=1, buffer=auth_fields)
 
     def authenticate(self, connection):
@@ -904,9 +1152,49 @@ class SAPHDBAuthMethod(object):
         """
 
         auth_request = self.craft_authentication_request(connection=connection)
+        if log_saphdb.isEnabledFor(logging.DEBUG):
+            log_saphdb.debug("Authentication request:\n%s", auth_request.show(dump=True))
 
         auth_response = connection.sr(auth_request)
+        auth_response_part = self.check_authentication_response(auth_response)
+
+        # Craft authentication part and return it
+        return self.craft_authentication_response_part(auth_response_part)
+
+    async def authenticate_async(self, connection):
+        """Asynchronous version of :meth:`authenticate`, performing the round trip with the server
+        over an asynchronous connection.
+
+        :param connection: connection to the server
+        :type connection: :class:`SAPHDBAsyncConnection`
 
+        :return: authentication part to use in Connect packet
+        :rtype: SAPHDBPart
+
+        :raise: SAPHDBAuthenticationError
+        """
+        auth_request = self.craft_authentication_request(connection=connection)
+        if log_saphdb.isEnabledFor(logging.DEBUG):
+            log_saphdb.debug("Authentication request:\n%s", auth_request.show(dump=True))
+
+        auth_response = await connection.sr(auth_request)
+        auth_response_part = self.check_authentication_response(auth_response)
+
+        # Craft authentication part and return it
+        return self.craft_authentication_response_part(auth_response_part)
+
+    def check_authentication_response(self, auth_response):
+        """Checks the response to an authentication request and returns the `AUTHENTICATION` Part
+        replied by the server.
+
+        :param auth_response: response received from the server
+        :type auth_response: :class:`SAPHDB`
+
+        :return: authentication part replied by the server
+        :rtype: :class:`SAPHDBPartAuthentication`
+
+        :raise: SAPHDBAuthenticationError
+        """
         # Check if the response is an error
         if auth_response.segments[0].segmentkind == 5:  # If is Error segment kind
             raise SAPHDBAuthenticationError("Authentication failed")
@@ -914,11 +1202,10 @@ class SAPHDBAuthMethod(object):
         auth_response_part = auth_response.segments[0].parts[0].buffer[0]
 
         # Check the method replied by the server
-        if self.METHOD != auth_response_part.auth_fields[0].value:
+        if not self.is_method(auth_response_part.auth_fields[0].value):
             raise SAPHDBAuthenticationError("Authentication method not supported on server")
 
-        # Craft authentication part and return it
-        return self.craft_authentication_response_part(auth_response_part)
+        return auth_response_part
 
     def process_connect_response(self, connect_reponse, connection=None):
         """Process the final response from the authentication process when needed, according to the authentication
@@ -928,10 +1215,17 @@ class SAPHDBAuthMethod(object):
            connect_reponse.segments[0].parts[0].partkind == 33 and \
            len(connect_reponse.segments[0].parts[0].buffer) and \
            len(connect_reponse.segments[0].parts[0].buffer[0].auth_fields) and \
-           connect_reponse.segments[0].parts[0].buffer[0].auth_fields[0].value == self.METHOD:
+           self.is_method(connect_reponse.segments[0].parts[0].buffer[0].auth_fields[0].value):
             self.session_cookie = connect_reponse.segments[0].parts[0].buffer[0].auth_fields[1].value
 
 
+hdb_scram_proof_size_struct = struct.Struct("b")
+"""SAP HDB SCRAM client proof size, as included in the client proof field"""
+
+hdb_scram_rounds_struct = struct.Struct(">I")
+"""SAP HDB SCRAM number of rounds, as included in the server challenge field"""
+
+
 class SAPHDBAuthScramMethod(SAPHDBAuthMethod):
     """SAP HDB Authentication using a SCRAM-based algorithm
 
@@ -941,33 +1235,36 @@ class SAPHDBAuthScramMethod(SAPHDBAuthMethod):
 
     SCRAM_CLASS = None
 
+    __slots__ = ["password", "scram", "client_key"]
+
     def __init__(self, username, password):
+        if self.SCRAM_CLASS is None:
+            raise ValueError("{} doesn't define a SCRAM algorithm".format(self.__class__.__name__))
         super(SAPHDBAuthScramMethod, self).__init__(username)
         self.password = password
-        self.client_key = self.scram = None
+        # SCRAM objects don't keep state between handshakes, so a single one is used
+        self.scram = self.SCRAM_CLASS()
+        self.client_key = None
 
     def obtain_client_proof(self, scram, client_key, auth_response_part):
         """Calculates the client proof with the salt and server key obtained from the authentication
         response part.
         """
         # Obtain the salt and the server key from the response
-        method_parts = SAPHDBPartAuthentication(auth_response_part.auth_fields[1].value)
-        salt = method_parts.auth_fields[0].value
-        server_key = method_parts.auth_fields[1].value
+        method_parts = hdb_parse_auth_fields(auth_response_part.auth_fields[1].value)
+        salt = method_parts[0]
+        server_key = method_parts[1]
 
         # Calculate the client proof from the password, salt and the server and client key
         # TODO: It might be good to see if this can be moved into a new Packet
         # TODO: We're only considering one server key
-        client_proof = b"\x00\x01" + struct.pack('b', scram.CLIENT_PROOF_SIZE)
-        client_proof += scram.scramble_salt(self.password, salt, server_key, client_key)
-
-        return client_proof
+        return b"".join([b"\x00\x01", hdb_scram_proof_size_struct.pack(scram.CLIENT_PROOF_SIZE),
+                         scram.scramble_salt(self.password, salt, server_key, client_key)])
 
     def craft_authentication_request(self, value=None, connection=None):
-        """Instantiates the SCRAM class and craft the authentication request.
+        """Obtains a new client key and craft the authentication request.
         """
         if value is None:
-            self.scram = self.SCRAM_CLASS(default_backend())
             # Craft and send the authentication packet
             self.client_key = self.scram.get_client_key()
             value = self.client_key
@@ -987,6 +1284,8 @@ class SAPHDBAuthScramSHA256Method(SAPHDBAuthScramMethod):
     METHOD = "SCRAMSHA256"
     SCRAM_CLASS = SCRAM_SHA256
 
+    __slots__ = []
+
 
 class SAPHDBAuthScramPBKDF2SHA256Method(SAPHDBAuthScramMethod):
     """SAP HDB Authentication using SCRAM-PBKDF2-SHA256 algorithm.
@@ -994,19 +1293,20 @@ class SAPHDBAuthScramPBKDF2SHA256Method(SAPHDBAuthScramMethod):
     METHOD = "SCRAMPBKDF2SHA256"
     SCRAM_CLASS = SCRAM_PBKDF2SHA256
 
+    __slots__ = []
+
     def obtain_client_proof(self, scram, client_key, auth_response_part):
         # Obtain the salt, the server key and the number of rounds from the response
-        method_parts = SAPHDBPartAuthentication(auth_response_part.auth_fields[1].value)
-        salt = method_parts.auth_fields[0].value
-        server_key = method_parts.auth_fields[1].value
-        rounds, = struct.unpack('>I', method_parts.auth_fields[2].value)
+        method_parts = hdb_parse_auth_fields(auth_response_part.auth_fields[1].value)
+        salt = method_parts[0]
+        server_key = method_parts[1]
+        rounds, = hdb_scram_rounds_struct.unpack(method_parts[2])
 
         # Calculate the client proof from the password, salt, rounds and the server and client key
         # TODO: It might be good to see if this can be moved into a new Packet
         # TODO: We're only considering one server key
-        client_proof = b"\x00\x01" + struct.pack('b', scram.CLIENT_PROOF_SIZE)
-        client_proof += scram.scramble_salt(self.password, salt, server_key, client_key, rounds)
-        return client_proof
+        return b"".join([b"\x00\x01", hdb_scram_proof_size_struct.pack(scram.CLIENT_PROOF_SIZE),
+                         scram.scramble_salt(self.password, salt, server_key, client_key, rounds)])
 
 
 class SAPHDBAuthSessionCookieMethod(SAPHDBAuthMethod):
@@ -1015,6 +1315,8 @@ class SAPHDBAuthSessionCookieMethod(SAPHDBAuthMethod):
 
     METHOD = "SessionCookie"
 
+    __slots__ = []
+
     def __init__(self, username, session_cookie):
         super(SAPHDBAuthSessionCookieMethod, self).__init__(username)
         self.session_cookie = session_cookie
@@ -1030,6 +1332,8 @@ class SAPHDBAuthJWTMethod(SAPHDBAuthMethod):
 
     METHOD = "JWT"
 
+    __slots__ = ["jwt"]
+
     def __init__(self, username, jwt):
         super(SAPHDBAuthJWTMethod, self).__init__(username)
         self.jwt = jwt
@@ -1045,6 +1349,8 @@ class SAPHDBAuthSAMLMethod(SAPHDBAuthMethod):
 
     METHOD = "SAML"
 
+    __slots__ = ["saml_assertion"]
+
     def __init__(self, username, saml_assertion):
         super(SAPHDBAuthSAMLMethod, self).__init__(username)
         self.saml_assertion = saml_assertion
@@ -1074,6 +1380,8 @@ class SAPHDBAuthGSSMethod(SAPHDBAuthMethod):
     TYPEOID_GSS_KRB5_NT_PRINCIPAL_NAME = "1.2.840.113554.1.2.2.1"
     TYPEOID_GSS_KRB5_NT_PRINCIPAL_NAME_pre_RFC_1964 = "1.2.840.113554.1.2.2.2"
 
+    __slots__ = ["krb5ticket", "krb5ticket_callback", "krb5oid", "typeoid"]
+
     def __init__(self, username, krb5ticket=None, krb5ticket_callback=None, krb5oid=None, typeoid=None):
         super(SAPHDBAuthGSSMethod, self).__init__(username)
         self.krb5ticket = krb5ticket
@@ -1089,16 +1397,13 @@ class SAPHDBAuthGSSMethod(SAPHDBAuthMethod):
         doesn't use the standard ASN.1 encoding and instead leverage the same Authentication Field
         format.
         """
-        auth_fields = SAPHDBPartAuthentication(auth_fields=[SAPHDBPartAuthenticationField(value=""),
-                                                            SAPHDBPartAuthenticationField(value=self.METHOD),
-                                                            SAPHDBPartAuthenticationField(value=value)])
-        auth_part = SAPHDBPart(partkind=33, argumentcount=1, buffer=auth_fields)
-        auth_segm = SAPHDBSegment(messagetype=65, parts=[auth_part])
-
+        auth_fields = b"".join([b"\x03\x00", hdb_auth_field_bytes(""), self._method_field,
+                                hdb_auth_field_bytes(value)])
+        parts = [hdb_build_part(33, auth_fields)]
         if connection:
-            auth_segm.parts.insert(0, connection.craft_client_context_part())
+            parts.insert(0, connection.craft_client_context_part_raw())
 
-        return SAPHDB(segments=[auth_segm])
+        return SAPHDB(hdb_build_request(65, parts))
 
     def craft_authentication_response_part(self, auth_response_part, value=None):
         """In GSS, the final round trip with the server returns a GSS token that is mech specific.
@@ -1115,19 +1420,15 @@ class SAPHDBAuthGSSMethod(SAPHDBAuthMethod):
                                                                SAPHDBPartAuthenticationField(value="\x05")])
         return super(SAPHDBAuthGSSMethod, self).craft_authentication_response_part(auth_response_part, last_gss_token)
 
-    def authenticate(self, connection):
-        """Method to authenticate the client connection. It performs the round trip with the server as required
-        by the method implemented, and returns the `AUTHENTICATION` Part.
+    def craft_initial_gss_request(self, connection=None):
+        """Crafts the first authentication request, containing the initial GSS token.
 
         :param connection: connection to the server
         :type connection: :class:`SAPHDBConnection`
 
-        :return: authentication part to use in Connect packet
-        :rtype: SAPHDBPart
-
-        :raise: SAPHDBAuthenticationError
+        :return: authentication request
+        :rtype: :class:`SAPHDB`
         """
-
         # The initial GSS token includes the NegTokenInit structure:
         #  * krb5oid: GSS mechs to use
         #  * commtype: communication type ("\x01")
@@ -1137,25 +1438,30 @@ class SAPHDBAuthGSSMethod(SAPHDBAuthMethod):
                                                                 SAPHDBPartAuthenticationField(value="\x01"),
                                                                 SAPHDBPartAuthenticationField(value=self.typeoid),
                                                                 SAPHDBPartAuthenticationField(value=self.username)])
-        first_auth_request = self.craft_authentication_request(first_gss_token, connection=connection)
-        first_auth_response = connection.sr(first_auth_request)
+        return self.craft_authentication_request(first_gss_token, connection=connection)
 
-        # Check if the response is an error
-        if first_auth_response.segments[0].segmentkind == 5:  # If is Error segment kind
-            raise SAPHDBAuthenticationError("Authentication failed")
+    def craft_ticket_gss_request(self, first_auth_response_part, connection=None):
+        """Crafts the second authentication request, containing the GSSAPI KRB5 AP-REQ structure
+        obtained for the SPN replied by the server.
 
-        first_auth_response_part = first_auth_response.segments[0].parts[0].buffer[0]
-        # Check the method replied by the server
-        if self.METHOD != first_auth_response_part.auth_fields[0].value:
-            raise SAPHDBAuthenticationError("Authentication method not supported on server")
+        :param first_auth_response_part: authentication part replied to the first request
+        :type first_auth_response_part: :class:`SAPHDBPartAuthentication`
+
+        :param connection: connection to the server
+        :type connection: :class:`SAPHDBConnection`
+
+        :return: authentication request
+        :rtype: :class:`SAPHDB`
 
+        :raise: SAPHDBAuthenticationError
+        """
         # The initial response from the server includes the NegTokenResp structure:
         #  * krb5oid: GSS mechs to use
         #  * commtype: communication type ("\x02")
         #  * typeoid: type of the client GSS name
         #  * spn: SPN to ask the KDC the ticket for
         #  * username: database username mapped from the UPN
-        initial_gss_token = SAPHDBPartAuthentication(first_auth_response_part.auth_fields[1].value)
+        initial_gss_token = hdb_parse_auth_fields(first_auth_response_part.auth_fields[1].value)
 
         # We either assume the GSSAPI KRB5 AP-REQ structure was already provided, or use a callback
         # to obtain it based on the SPN, the UPN and the database username mapped by the server.
@@ -1163,9 +1469,9 @@ class SAPHDBAuthGSSMethod(SAPHDBAuthMethod):
             krb5ticket = self.krb5ticket
         else:
             try:
-                krb5ticket = self.krb5ticket_callback(initial_gss_token.auth_fields[3].value,
+                krb5ticket = self.krb5ticket_callback(bytes(initial_gss_token[3]),
                                                       self.username,
-                                                      initial_gss_token.auth_fields[4].value)
+                                                      bytes(initial_gss_token[4]))
             except Exception:
                 raise SAPHDBAuthenticationError("Unable to obtain a Kerberos ticket to authenticate")
 
@@ -1176,18 +1482,46 @@ class SAPHDBAuthGSSMethod(SAPHDBAuthMethod):
         second_gss_value = SAPHDBPartAuthentication(auth_fields=[SAPHDBPartAuthenticationField(value=self.krb5oid),
                                                                  SAPHDBPartAuthenticationField(value="\x03"),
                                                                  SAPHDBPartAuthenticationField(value=krb5ticket)])
-        second_auth_request = self.craft_authentication_request(second_gss_value, connection=connection)
-        second_auth_response = connection.sr(second_auth_request)
+        return self.craft_authentication_request(second_gss_value, connection=connection)
 
-        # Check if the response is an error
-        if second_auth_response.segments[0].segmentkind == 5:  # If is Error segment kind
-            raise SAPHDBAuthenticationError("Authentication failed")
+    def authenticate(self, connection):
+        """Method to authenticate the client connection. It performs the round trip with the server as required
+        by the method implemented, and returns the `AUTHENTICATION` Part.
 
-        second_auth_response_part = second_auth_response.segments[0].parts[0].buffer[0]
+        :param connection: connection to the server
+        :type connection: :class:`SAPHDBConnection`
 
-        # Check the method replied by the server
-        if self.METHOD != second_auth_response_part.auth_fields[0].value:
-            raise SAPHDBAuthenticationError("Authentication method not supported on server")
+        :return: authentication part to use in Connect packet
+        :rtype: SAPHDBPart
+
+        :raise: SAPHDBAuthenticationError
+        """
+        first_auth_response = connection.sr(self.craft_initial_gss_request(connection))
+        first_auth_response_part = self.check_authentication_response(first_auth_response)
+
+        second_auth_response = connection.sr(self.craft_ticket_gss_request(first_auth_response_part, connection))
+        second_auth_response_part = self.check_authentication_response(second_auth_response)
+
+        # Craft authentication part and return it
+        return self.craft_authentication_response_part(second_auth_response_part)
+
+    async def authenticate_async(self, connection):
+        """Asynchronous version of :meth:`authenticate`.
+
+        :param connection: connection to the server
+        :type connection: :class:`SAPHDBAsyncConnection`
+
+        :return: authentication part to use in Connect packet
+        :rtype: SAPHDBPart
+
+        :raise: SAPHDBAuthenticationError
+        """
+        first_auth_response = await connection.sr(self.craft_initial_gss_request(connection))
+        first_auth_response_part = self.check_authentication_response(first_auth_response)
+
+        second_auth_response = await connection.sr(self.craft_ticket_gss_request(first_auth_response_part,
+                                                                                 connection))
+        second_auth_response_part = self.check_authentication_response(second_auth_response)
 
         # Craft authentication part and return it
         return self.craft_authentication_response_part(second_auth_response_part)
@@ -1202,9 +1536,9 @@ class SAPHDBAuthGSSMethod(SAPHDBAuthMethod):
             #  * krb5oid: GSS mechs to use
             #  * commtype: communication type ("\x07")
             #  * session cookie: the SessionCookie established for the connection
-            gss_token = SAPHDBPartAuthentication(self.session_cookie)
-            if gss_token.auth_fields[1].value == "\x07":
-                self.session_cookie = gss_token.auth_fields[2].value
+            gss_token = hdb_parse_auth_fields(self.session_cookie)
+            if len(gss_token) > 2 and gss_token[1] == b"\x07":
+                self.session_cookie = bytes(gss_token[2])
             else:
                 self.session_cookie = None
 
@@ -1225,6 +1559,27 @@ class SAPHDBConnectionError(Exception):
     """
 
 
+def hdb_requires_connection(method):
+    """Decorator for :class:`SAPHDBConnection` methods that require the connection to be established.
+    The check is performed once per call, and works both on regular methods and coroutines.
+
+    :raise: SAPHDBConnectionError
+    """
+    if asyncio.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            if not self.is_connected():
+                raise SAPHDBConnectionError("Socket not ready")
+            return await method(self, *args, **kwargs)
+    else:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if not self.is_connected():
+                raise SAPHDBConnectionError("Socket not ready")
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class SAPHDBConnection(object):
     """SAP HDB Connection
 
@@ -1286,6 +1641,20 @@ class SAPHDBConnection(object):
                           SAPHDBPartClientContext(key=3, type=29, value=self.app_name)]
         return SAPHDBPart(partkind=29, buffer=client_context)
 
+    def craft_client_context_part_raw(self):
+        """Crafts the raw bytes of the client context part, matching the ones of the packet returned by
+        :meth:`craft_client_context_part` without building it.
+
+        :return: Client Context Part raw bytes
+        :rtype: bytes
+        """
+        rows = []
+        for key, value in ((1, self.client_version), (2, self.client_type), (3, self.app_name)):
+            value = bytes_encode(value)
+            rows.append(hdb_option_row_string_header_struct.pack(key, 29, len(value)))
+            rows.append(value)
+        return hdb_build_part(29, b"".join(rows), argumentcount=3)
+
     def connect(self):
         """Creates a :class:`SAPNIStreamSocket` connection to the host/port. If a route
         was specified, connect to the target HANA server through the SAP Router.
@@ -1298,6 +1667,8 @@ class SAPHDBConnection(object):
                                                                      self.route,
                                                                      base_cls=SAPHDB,
                                                                      talk_mode=1)
+            # The protocol works with small request/response packets, so disable Nagle's algorithm
+            self._stream_socket.ins.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
         except socket.error as e:
             raise SAPHDBConnectionError("Error connecting to the server (%s)" % e)
 
@@ -1309,20 +1680,19 @@ class SAPHDBConnection(object):
         """
         return self._stream_socket is not None
 
+    @hdb_requires_connection
     def send(self, message):
         """Sends a packet to the server
         """
-        if not self.is_connected():
-            raise SAPHDBConnectionError("Socket not ready")
         self._stream_socket.send(message)
 
+    @hdb_requires_connection
     def sr(self, message):
         """Sends a packet to the server and receives a response."""
-        if not self.is_connected():
-            raise SAPHDBConnectionError("Socket not ready")
-        self.send(message)
-        return self.recv()
+        self._stream_socket.send(message)
+        return SAPHDB(bytes(self._recv_packet()))
 
+    @hdb_requires_connection
     def recv(self):
         """Receives a packet from the server.
 
@@ -1332,57 +1702,116 @@ class SAPHDBConnection(object):
         :return: the received packet
         :rtype: :class:`SAPHDB`
         """
-        if not self.is_connected():
-            raise SAPHDBConnectionError("Socket not ready")
+        return SAPHDB(bytes(self._recv_packet()))
+
+    @hdb_requires_connection
+    def recv_raw(self):
+        """Receives a packet from the server without dissecting it.
+
+        The variable length is read directly from the 32-bytes header, and the payload is then received
+        into a buffer allocated for the whole packet, so callers that only need to look at some bytes of
+        the packet can avoid building the :class:`SAPHDB` layers.
+
+        :return: the received packet raw bytes
+        :rtype: bytearray
+
+        :raise: SAPHDBConnectionError
+        """
+        return self._recv_packet()
+
+    def _recv_packet(self):
+        """Receives the raw bytes of a packet, without checking if the connection is established.
+        """
         # First we receive the header to obtain the variable length field
-        header_raw = self._stream_socket.ins.recv(32)
-        header = SAPHDB(header_raw)
-        # Then get the payload
-        payload = ""
-        if header.varpartlength > 0:
-            payload = self._stream_socket.ins.recv(header.varpartlength)
-        # And finally construct the whole packet with header plus payload
-        return SAPHDB(header_raw + payload)
+        header_raw = bytearray(32)
+        self._recv_into(memoryview(header_raw))
+        varpartlength, = struct.unpack_from("<I", header_raw, 12)
+        if not varpartlength:
+            return header_raw
+        # Then receive the payload after the header
+        packet_raw = bytearray(32 + varpartlength)
+        packet_raw[:32] = header_raw
+        self._recv_into(memoryview(packet_raw)[32:])
+        return packet_raw
+
+    def _recv_into(self, buffer):
+        """Receives data from the server until the given buffer is filled.
+
+        :param buffer: buffer to fill
+        :type buffer: memoryview
+
+        :raise: SAPHDBConnectionError
+        """
+        while len(buffer):
+            received = self._stream_socket.ins.recv_into(buffer)
+            if not received:
+                raise SAPHDBConnectionError("Connection closed by the server")
+            buffer = buffer[received:]
 
+    @hdb_requires_connection
     def initialize(self):
         """Initializes the connection with the server.
         """
-        if not self.is_connected():
-            raise SAPHDBConnectionError("Socket not ready")
-
         if self.product_version is not None and self.protocol_version is not None:
             return
 
         # Send initialization request packet
-        init_request = SAPHDBInitializationRequest()
-        self.send(init_request)
+        self._stream_socket.ins.sendall(hdb_initialization_request)
 
         # Receive initialization response packet
-        init_reply = SAPHDBInitializationReply(self._stream_socket.recv(8))  # We use the raw socket recv here
+        init_reply_raw = bytearray(8)
+        self._recv_into(memoryview(init_reply_raw))  # We use the raw socket recv here
+        init_reply = SAPHDBInitializationReply(bytes(init_reply_raw))
         self.product_version = init_reply.product_major
         self.protocol_version = init_reply.protocol_major
 
+    @hdb_requires_connection
     def authenticate(self):
         """Authenticates the connection against the server using the selected method.
 
         :raises: SAPHDBAuthenticationError
         """
-        if not self.is_connected():
-            raise SAPHDBConnectionError("Socket not ready")
-
         # Perform the authentication handshake and obtain the final authentication part.
         # Note that this might involve a series of round trips depending on the authentication
         # method.
         auth_part = self.auth_method.authenticate(self)
 
-        # Craft the CONNECT packet
-        clientcontext_part = SAPHDBPart(partkind=29)
-        clientid_part = SAPHDBPart(partkind=35, buffer=SAPHDBPartClientId(clientid=self.client_id))
-        connect_segm = SAPHDBSegment(messagetype=66, parts=[clientcontext_part, auth_part, clientid_part])
-        connect_request = SAPHDB(segments=[connect_segm])
-
         # Send connect packet
-        connect_response = self.sr(connect_request)
+        log_saphdb.debug("Sending connect request using %s authentication method", self.auth_method.METHOD)
+        connect_response = self.sr(self.craft_connect_request(auth_part))
+        self.process_connect_response(connect_response)
+
+    def craft_connect_request(self, auth_part):
+        """Crafts the CONNECT packet that completes the authentication.
+
+        :param auth_part: authentication part obtained from the authentication method
+        :type auth_part: :class:`SAPHDBPart`
+
+        :return: CONNECT packet
+        :rtype: :class:`SAPHDB`
+        """
+        clientcontext_part = hdb_build_part(29, b"", argumentcount=0)
+        clientid_part = hdb_build_part(35, bytes_encode(self.client_id))
+        return SAPHDB(hdb_build_request(66, [clientcontext_part, bytes(auth_part), clientid_part]))
+
+    def craft_disconnect_request(self):
+        """Crafts the DISCONNECT packet that closes the connection.
+
+        :return: DISCONNECT packet
+        :rtype: :class:`SAPHDB`
+        """
+        return SAPHDB(hdb_build_request(77, []))
+
+    def process_connect_response(self, connect_response):
+        """Processes the response to the CONNECT packet, closing the socket if the authentication failed.
+
+        :param connect_response: response received from the server
+        :type connect_response: :class:`SAPHDB`
+
+        :raises: SAPHDBAuthenticationError
+        """
+        if log_saphdb.isEnabledFor(logging.DEBUG):
+            log_saphdb.debug("Connect response:\n%s", connect_response.show(dump=True))
 
         if connect_response.segments[0].segmentkind == 5:  # If is Error segment kind
             self.close_socket()
@@ -1408,8 +1837,7 @@ class SAPHDBConnection(object):
             raise SAPHDBConnectionError("Connection already closed")
 
         try:
-            disconnect_segm = SAPHDBSegment(messagetype=77)
-            disconnect_request = SAPHDB(segments=[disconnect_segm])
+            disconnect_request = self.craft_disconnect_request()
 
             # Send disconnect packet and check the response
             disconnect_response = self.sr(disconnect_request)
@@ -1441,14 +1869,25 @@ class SAPHDBTLSConnection(SAPHDBConnection):
     TLS_CERT_TRUST = False
     TLS_CERT_FILE = None
     TLS_CHECK_HOSTNAME = False
-    TLS_DEFAULT_PROTOCOL = ssl.PROTOCOL_TLS
-    TLS_DEFAULT_OPTIONS = ssl.OP_NO_TLSv1 | ssl.OP_NO_TLSv1_1
+    TLS_DEFAULT_PROTOCOL = ssl.PROTOCOL_TLS_CLIENT
+    TLS_DEFAULT_OPTIONS = 0
+    TLS_DEFAULT_MINIMUM_VERSION = ssl.TLSVersion.TLSv1_2
     TLS_DEFAULT_CIPHERS = "TLS_AES_256_GCM_SHA384:TLS_CHACHA20_POLY1305_SHA256:TLS_AES_128_GCM_SHA256:AES256-GCM-SHA384:AES256-CCM8"
 
+    TLS_CONTEXTS_CACHE_SIZE = 16
+    TLS_SESSIONS_CACHE_SIZE = 64
+
+    _tls_contexts = OrderedDict()
+    """TLS/SSL contexts shared across connections with the same TLS parameters, least recently used first"""
+
+    _tls_sessions = OrderedDict()
+    """TLS/SSL sessions established with each server to resume them when reconnecting, together with the context
+    they were established with, least recently used first"""
+
     def __init__(self, host, port, auth_method=None, route=None, pid=None, hostname=None,
                  client_version=None, client_type=None, app_name=None, tls_cert_trust=None,
                  tls_cert_file=None, tls_check_hostname=None, tls_protocol=None,
-                 tls_options=None, tls_ciphers=None):
+                 tls_options=None, tls_ciphers=None, tls_minimum_version=None):
         super(SAPHDBTLSConnection, self).__init__(host, port, auth_method, route, pid, hostname,
                                                   client_version, client_type, app_name)
         # Get TLS related parameters or set default values.
@@ -1458,20 +1897,127 @@ class SAPHDBTLSConnection(SAPHDBConnection):
         self.tls_protocol = tls_protocol or self.TLS_DEFAULT_PROTOCOL
         self.tls_options = tls_options or self.TLS_DEFAULT_OPTIONS
         self.tls_ciphers = tls_ciphers or self.TLS_DEFAULT_CIPHERS
+        self.tls_minimum_version = tls_minimum_version or self.TLS_DEFAULT_MINIMUM_VERSION
 
     def connect(self):
         # Create a plain socket first
         plain_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         plain_socket.settimeout(10)
+        plain_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        # Wrap the plain socket in a TLS/SSL one, resuming the last session established with the server if any.
+        # Sessions can only be resumed with the context they were established with, which might have been
+        # evicted from the cache and created again since then.
+        context = self.get_tls_context()
+        session_key = (self.tls_context_key, self.host, self.port)
+        session = None
+        cached_session = self._cache_get(self._tls_sessions, session_key)
+        if cached_session is not None:
+            session_context, session = cached_session
+            if session_context is not context:
+                del self._tls_sessions[session_key]
+                session = None
+        tls_socket = context.wrap_socket(plain_socket, server_hostname=self.host, session=session)
+        tls_socket.connect((self.host, self.port))
 
+        # Create the stream socket from the TLS/SSL one. From here treatment should be similar to a plain one.
+        self._stream_socket = SSLStreamSocket(tls_socket, basecls=SAPHDB)
+        self.store_tls_session()
+
+    def store_tls_session(self):
+        """Stores the TLS/SSL session established with the server so it can be resumed by later
+        connections. With TLS 1.3 sessions can only be resumed with the tickets received after the
+        handshake, so they're only stored once a ticket was received, and again before closing the
+        socket.
+        """
+        tls_socket = self._stream_socket.ins
+        session = tls_socket.session
+        if session is None or (not session.has_ticket and tls_socket.version() == "TLSv1.3"):
+            return
+        self._cache_put(self._tls_sessions, (self.tls_context_key, self.host, self.port),
+                        (tls_socket.context, session), self.TLS_SESSIONS_CACHE_SIZE)
+
+    def close_socket(self):
+        """Closes the underlaying socket of the connection, storing the TLS/SSL session first
+        """
+        self.store_tls_session()
+        super(SAPHDBTLSConnection, self).close_socket()
+
+    @property
+    def tls_context_key(self):
+        """Returns the TLS parameters that identify the TLS/SSL context to use for the connection.
+
+        :return: TLS parameters
+        :rtype: tuple
+        """
+        return (self.tls_cert_trust, self.tls_cert_file, self.tls_check_hostname, self.tls_protocol,
+                self.tls_options, self.tls_ciphers, self.tls_minimum_version)
+
+    def get_tls_context(self):
+        """Returns the TLS/SSL context to use for the connection. Contexts are created once and shared
+        across all connections using the same TLS parameters, so their session cache is shared as well.
+
+        :return: TLS/SSL context
+        :rtype: :class:`ssl.SSLContext`
+        """
+        context = self._cache_get(self._tls_contexts, self.tls_context_key)
+        if context is None:
+            context = self.create_tls_context()
+            self._cache_put(self._tls_contexts, self.tls_context_key, context, self.TLS_CONTEXTS_CACHE_SIZE)
+        return context
+
+    @staticmethod
+    def _cache_get(cache, key):
+        """Returns an entry from a least recently used cache, marking it as the most recently used.
+
+        :param cache: cache to look the entry up
+        :type cache: :class:`collections.OrderedDict`
+
+        :param key: key of the entry
+
+        :return: the cached entry or None if not found
+        """
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+    @staticmethod
+    def _cache_put(cache, key, value, size):
+        """Stores an entry in a least recently used cache, evicting the least recently used
+        entries when the cache grows over its maximum size.
+
+        :param cache: cache to store the entry in
+        :type cache: :class:`collections.OrderedDict`
+
+        :param key: key of the entry
+
+        :param value: entry to store
+
+        :param size: maximum number of entries in the cache
+        :type size: int
+        """
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > size:
+            cache.popitem(last=False)
+
+    def create_tls_context(self):
+        """Creates the TLS/SSL context to use for the connection according to the TLS parameters.
+
+        :return: TLS/SSL context
+        :rtype: :class:`ssl.SSLContext`
+        """
         # Create the TLS/SSL Context. We first set the options as specified.
         context = ssl.SSLContext(self.tls_protocol)
         context.options |= self.tls_options
+        context.minimum_version = self.tls_minimum_version
         if self.tls_ciphers:
             context.set_ciphers(self.tls_ciphers)
 
         # Then set the certificate validation and the path to the certificate(s) if required.
         if self.tls_cert_trust:
+            context.check_hostname = False
             context.verify_mode = ssl.CERT_NONE
         else:
             context.verify_mode = ssl.CERT_REQUIRED
@@ -1482,12 +2028,208 @@ class SAPHDBTLSConnection(SAPHDBConnection):
         else:
             context.set_default_verify_paths()
 
-        # Wrap the plain socket in a TLS/SSL one
-        tls_socket = context.wrap_socket(plain_socket, server_hostname=self.host)
-        tls_socket.connect((self.host, self.port))
+        return context
 
-        # Create the stream socket from the TLS/SSL one. From here treatment should be similar to a plain one.
-        self._stream_socket = SSLStreamSocket(tls_socket, basecls=SAPHDB)
+
+class SAPHDBAsyncConnection(SAPHDBConnection):
+    """SAP HDB Asynchronous Connection
+
+    This class represents a client connection to a HANA server built on top of
+    :mod:`asyncio` streams. It exposes the same interface as :class:`SAPHDBConnection`,
+    but the methods that perform network operations are coroutines, so many connections
+    can be driven concurrently, e.g.::
+
+        await asyncio.gather(*[connection.connect_authenticate() for connection in connections])
+
+    Connections through a SAP Router are not supported.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(SAPHDBAsyncConnection, self).__init__(*args, **kwargs)
+        self._reader = None
+        self._writer = None
+
+    async def connect(self, timeout=10):
+        """Opens a stream connection to the host/port. Note that asyncio already disables
+        Nagle's algorithm on TCP transports.
+
+        :param timeout: seconds to wait for the connection to be established
+        :type timeout: float
+
+        :raises: SAPHDBConnectionError
+        """
+        if self.route:
+            raise SAPHDBConnectionError("Routed connections are not supported on asynchronous connections")
+        try:
+            self._reader, self._writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port),
+                                                                timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            raise SAPHDBConnectionError("Error connecting to the server (%s)" % e)
+
+    def is_connected(self):
+        """Returns if the underlying stream is connected.
+
+        :return: If the underlying stream is connected.
+        :rtype: bool
+        """
+        return self._writer is not None
+
+    @hdb_requires_connection
+    async def send(self, message):
+        """Sends a packet to the server
+        """
+        self._writer.write(bytes(message))
+        await self._writer.drain()
+
+    @hdb_requires_connection
+    async def sr(self, message):
+        """Sends a packet to the server and receives a response."""
+        self._writer.write(bytes(message))
+        await self._writer.drain()
+        return SAPHDB(await self._recv_packet())
+
+    @hdb_requires_connection
+    async def recv(self):
+        """Receives a packet from the server.
+
+        :return: the received packet
+        :rtype: :class:`SAPHDB`
+        """
+        return SAPHDB(await self._recv_packet())
+
+    @hdb_requires_connection
+    async def recv_raw(self):
+        """Receives a packet from the server without dissecting it.
+
+        :return: the received packet raw bytes
+        :rtype: bytes
+
+        :raise: SAPHDBConnectionError
+        """
+        return await self._recv_packet()
+
+    async def _recv_packet(self):
+        """Receives the raw bytes of a packet, without checking if the connection is established.
+        """
+        try:
+            # First we receive the header to obtain the variable length field
+            header_raw = await self._reader.readexactly(32)
+            varpartlength, = struct.unpack_from("<I", header_raw, 12)
+            if not varpartlength:
+                return header_raw
+            # Then receive the payload after the header
+            return header_raw + await self._reader.readexactly(varpartlength)
+        except asyncio.IncompleteReadError:
+            raise SAPHDBConnectionError("Connection closed by the server")
+
+    @hdb_requires_connection
+    async def initialize(self):
+        """Initializes the connection with the server.
+        """
+        if self.product_version is not None and self.protocol_version is not None:
+            return
+
+        # Send initialization request packet
+        self._writer.write(hdb_initialization_request)
+        await self._writer.drain()
+
+        # Receive initialization response packet
+        try:
+            init_reply = SAPHDBInitializationReply(await self._reader.readexactly(8))
+        except asyncio.IncompleteReadError:
+            raise SAPHDBConnectionError("Connection closed by the server")
+        self.product_version = init_reply.product_major
+        self.protocol_version = init_reply.protocol_major
+
+    @hdb_requires_connection
+    async def authenticate(self):
+        """Authenticates the connection against the server using the selected method.
+
+        :raises: SAPHDBAuthenticationError
+        """
+        auth_part = await self.auth_method.authenticate_async(self)
+
+        # Send connect packet
+        log_saphdb.debug("Sending connect request using %s authentication method", self.auth_method.METHOD)
+        connect_response = await self.sr(self.craft_connect_request(auth_part))
+        # Failed authentications close the stream, which has to be awaited here
+        if connect_response.segments[0].segmentkind == 5:  # If is Error segment kind
+            await self.close_socket()
+            raise SAPHDBAuthenticationError("Authentication failed")
+        self.process_connect_response(connect_response)
+
+    async def connect_authenticate(self):
+        """Connects to the server, performs initialization and authenticates the client.
+        """
+        if not self.is_connected():
+            await self.connect()
+        await self.initialize()
+        await self.authenticate()
+
+    async def close(self):
+        """Closes the connection with the server
+
+        :raise: SAPHDBConnectionError
+        """
+        if not self.is_connected():
+            raise SAPHDBConnectionError("Connection already closed")
+
+        try:
+            disconnect_request = self.craft_disconnect_request()
+
+            # Send disconnect packet and check the response
+            disconnect_response = await self.sr(disconnect_request)
+            if not hdb_segment_is_reply(disconnect_response.segments[0]) or \
+               disconnect_response.segments[0].functioncode != 18:
+                raise SAPHDBConnectionError("Connection incorrectly closed")
+
+        except OSError as e:
+            raise SAPHDBConnectionError("Error closing the connection to the server (%s)" % e)
+
+        finally:
+            await self.close_socket()
+
+    async def close_socket(self):
+        """Closes the underlaying stream of the connection, waiting for the transport (and the TLS/SSL
+        shutdown if any) to complete.
+        """
+        writer = self._writer
+        self._reader = None
+        self._writer = None
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            # The stream is closed anyway if the server reset the connection or the TLS/SSL shutdown failed
+            pass
+
+
+class SAPHDBAsyncTLSConnection(SAPHDBAsyncConnection, SAPHDBTLSConnection):
+    """SAP HDB Asynchronous Connection using TLS
+
+    This class uses the same TLS parameters as :class:`SAPHDBTLSConnection` over an
+    asynchronous connection. Contexts are shared with the synchronous connections, but
+    TLS/SSL sessions are neither stored nor resumed, as :mod:`asyncio` transports don't
+    support passing a session to the handshake. Each connection performs a full handshake.
+    """
+
+    async def connect(self, timeout=10):
+        """Opens a TLS stream connection to the host/port.
+
+        :param timeout: seconds to wait for the connection and the TLS handshake to complete
+        :type timeout: float
+
+        :raises: SAPHDBConnectionError
+        """
+        if self.route:
+            raise SAPHDBConnectionError("Routed connections are not supported on asynchronous connections")
+        try:
+            self._reader, self._writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port,
+                                                                                        ssl=self.get_tls_context(),
+                                                                                        server_hostname=self.host),
+                                                                timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            raise SAPHDBConnectionError("Error connecting to the server (%s)" % e)
 
 
 # Bind SAP NI with the HDB ports
@@ -278,7 +278,12 @@ class SCRAM(object):
     def scramble_salt(self, password, salt, server_key, client_key, rounds=None):
         """Scrambles a given salt using the specified server key.
         """
-        msg = salt + server_key + client_key
+        # HMAC and PBKDF2 primitives require the password as bytes
+        if isinstance(password, str):
+            password = password.encode("utf-8")
+
+        # Salt and keys might be buffers (e.g. memoryview) instead of bytes
+        msg = b"".join([salt, server_key, client_key])
 
         hmac_digest = self.salt_key(password, salt, rounds)
 
@@ -323,7 +328,8 @@ class SCRAM_PBKDF2SHA256(SCRAM_SHA256):
     """SCRAM scheme using PBKDF2 with SHA256"""
 
     def salt_key(self, password, salt, rounds):
-        pbkdf2 = PBKDF2HMAC(self.ALGORITHM(), self.CLIENT_PROOF_SIZE, salt, rounds)
+        # PBKDF2 requires the salt as bytes
+        pbkdf2 = PBKDF2HMAC(self.ALGORITHM(), self.CLIENT_PROOF_SIZE, bytes(salt), rounds)
         return pbkdf2.derive(password)
 
 
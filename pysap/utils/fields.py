@@ -289,6 +289,207 @@ class PacketListStopField(PacketListField):
         return remain + ret, lst
 
 
+class LazyPacketList(list):
+    """List of packets that are dissected when first accessed. Items are kept as raw bytes
+    until they are obtained by index or iteration, and are then replaced by the dissected packet.
+    Other operations that look at the items' values (e.g. membership, search, sorting,
+    concatenation or removal) dissect all the items first, so the list behaves as a list of
+    dissected packets.
+    """
+    __slots__ = ["dissect"]
+
+    def __init__(self, items, dissect):
+        """
+        :param items: raw bytes of each packet
+        :type items: ``list`` of bytes
+
+        :param dissect: function to dissect a packet from its raw bytes
+        :type dissect: C{callable}
+        """
+        list.__init__(self, items)
+        self.dissect = dissect
+
+    def _item(self, index):
+        item = list.__getitem__(self, index)
+        if isinstance(item, bytes):
+            item = self.dissect(item)
+            list.__setitem__(self, index, item)
+        return item
+
+    def _items(self):
+        """Dissects all the items and returns the list."""
+        for index in range(len(self)):
+            self._item(index)
+        return self
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._item(i) for i in range(*index.indices(len(self)))]
+        return self._item(index)
+
+    def __setitem__(self, index, value):
+        # Other lazy lists would be copied with their raw items
+        if isinstance(value, LazyPacketList):
+            value = list(value)
+        list.__setitem__(self, index, value)
+
+    def __contains__(self, item):
+        return list.__contains__(self._items(), item)
+
+    def __add__(self, other):
+        if not isinstance(other, list):
+            return NotImplemented
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        if not isinstance(other, list):
+            return NotImplemented
+        return list(other) + list(self)
+
+    def __iadd__(self, other):
+        self.extend(other)
+        return self
+
+    def __mul__(self, n):
+        return list.__mul__(self._items(), n)
+
+    __rmul__ = __mul__
+
+    def __imul__(self, n):
+        return list.__imul__(self._items(), n)
+
+    def __lt__(self, other):
+        if not isinstance(other, list):
+            return NotImplemented
+        return list(self) < list(other)
+
+    def __le__(self, other):
+        if not isinstance(other, list):
+            return NotImplemented
+        return list(self) <= list(other)
+
+    def __gt__(self, other):
+        if not isinstance(other, list):
+            return NotImplemented
+        return list(self) > list(other)
+
+    def __ge__(self, other):
+        if not isinstance(other, list):
+            return NotImplemented
+        return list(self) >= list(other)
+
+    def extend(self, other):
+        list.extend(self, list(other) if isinstance(other, LazyPacketList) else other)
+
+    def pop(self, index=-1):
+        try:
+            self._item(index)
+        except IndexError:
+            pass
+        return list.pop(self, index)
+
+    def index(self, item, *args):
+        return list.index(self._items(), item, *args)
+
+    def count(self, item):
+        return list.count(self._items(), item)
+
+    def remove(self, item):
+        list.remove(self._items(), item)
+
+    def sort(self, *args, **kwargs):
+        list.sort(self._items(), *args, **kwargs)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self._item(index)
+
+    def __reversed__(self):
+        for index in reversed(range(len(self))):
+            yield self._item(index)
+
+    def __eq__(self, other):
+        if not isinstance(other, list) or len(self) != len(other):
+            return False
+        for index in range(len(self)):
+            item, other_item = list.__getitem__(self, index), list.__getitem__(other, index)
+            # Items not dissected on both lists can be compared without dissecting them
+            if isinstance(item, bytes) and isinstance(other_item, bytes):
+                if item != other_item:
+                    return False
+            elif self._item(index) != other[index]:
+                return False
+        return True
+
+    def __ne__(self, other):
+        return not self == other
+
+    def copy(self):
+        return LazyPacketList([item if isinstance(item, bytes) else item.copy()
+                               for item in list.__iter__(self)], self.dissect)
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class LazyPacketListField(PacketListField):
+    """Custom field that contains a list of packets which are dissected only when accessed.
+
+    The raw bytes of each packet are split using a function that returns its length, so it
+    should be cheap to obtain the length without dissecting the packet (e.g. from a header field).
+    If a length can't be obtained, doesn't fit in the remaining data, or the data ends before the
+    expected number of packets, the packets are dissected eagerly as with :class:`PacketListField`,
+    so malformed data is dissected in the same way.
+    """
+    __slots__ = ["count_from", "length_from", "size_from"]
+
+    def __init__(self, name, default, cls, count_from=None, length_from=None, size_from=None):
+        """
+        :param size_from: function to obtain the length of a packet from the raw bytes starting with it,
+            raising ``struct.error`` or ``ValueError`` if the length can't be obtained
+        :type size_from: C{callable}
+        """
+        PacketListField.__init__(self, name, default, cls, count_from=count_from, length_from=length_from)
+        self.size_from = size_from
+
+    def dissect(self, pkt, m):
+        try:
+            return self.m2i(pkt, m)
+        except Exception:
+            if conf.debug_dissector:
+                raise
+            return conf.raw_layer(load=m)
+
+    def getfield(self, pkt, s):
+        c = l = None
+        if self.length_from is not None:
+            l = self.length_from(pkt)
+        elif self.count_from is not None:
+            c = self.count_from(pkt)
+
+        lst = []
+        ret = b""
+        remain = s
+        if l is not None:
+            remain, ret = s[:l], s[l:]
+        while remain:
+            if c is not None:
+                if c <= 0:
+                    break
+                c -= 1
+            try:
+                size = self.size_from(remain)
+            except (struct.error, ValueError):
+                size = None
+            if size is None or not 0 < size <= len(remain):
+                return PacketListField.getfield(self, pkt, s)
+            lst.append(remain[:size])
+            remain = remain[size:]
+        if c is not None and c > 0:
+            return PacketListField.getfield(self, pkt, s)
+        return remain + ret, LazyPacketList(lst, lambda m: self.dissect(pkt, m))
+
+
 class AdjustableFieldLenField(Field):
     __slots__ = ["length_of", "count_of", "adjust"]
 
@@ -305,7 +506,7 @@ class AdjustableFieldLenField(Field):
     def addfield(self, pkt, s, val):
         i2m = self.i2m(pkt, val)
         fmt = "B"
-        padd = ""
+        padd = b""
         if i2m > 0xf0:
             fmt = ">H"
             padd = struct.pack("B", 0xff)
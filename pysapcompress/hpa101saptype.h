@@ -49,3 +49,21 @@ typedef unsigned int SAP_UINT;                   /* Value range:    */
 #define USE(param) ((param)=(param))
 
 
+/**********************************************************************/
+/* CPU dispatch of the decompression loops                            */
+/* On x86 glibc targets the hot loops are built for both the baseline */
+/* ISA and AVX2, and the variant is selected at load time from the    */
+/* CPU features (GNU ifunc). Define CS_NO_CPU_DISPATCH to disable it. */
+/**********************************************************************/
+#if !defined(CS_NO_CPU_DISPATCH) && defined(__GLIBC__) && \
+    (defined(__x86_64__) || defined(__i386__)) && defined(__has_attribute)
+  #if __has_attribute(target_clones)
+    #define CS_CPU_DISPATCH __attribute__((target_clones("avx2", "default")))
+  #endif
+#endif
+
+#ifndef CS_CPU_DISPATCH
+  #define CS_CPU_DISPATCH
+#endif
+
+
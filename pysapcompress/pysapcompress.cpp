@@ -25,7 +25,6 @@
 
 #include <stdio.h>
 #include <stdlib.h>
-#include <assert.h>
 #include <string.h>
 #include <limits.h>
 
@@ -176,7 +175,6 @@ int decompress_packet (const unsigned char *in, const int in_length, unsigned ch
 		*out_length = 0;
 		return (CS_E_MEMORY_ERROR);
 	}
-	memset(bufout, 0, bufout_length);
 
 #ifdef DEBUG_TRACE
 	printf("pysapcompress.cpp: Input buffer %p (%d bytes), output buffer %p (%d bytes)\n", bufin, bufin_length, bufout, bufout_length);
@@ -212,31 +210,20 @@ int decompress_packet (const unsigned char *in, const int in_length, unsigned ch
 
 	}
 
-	/* Successful decompression */
+	/* Successful decompression, hand the output buffer to the caller */
 	if (rt == CS_END_OF_STREAM) {
 		*out_length = total_decompressed;
-
-        /* Allocate the required memory */
-        *out = (unsigned char *)malloc(total_decompressed);
-        if (*out){
-
-		    /* Copy the buffer in the out parameter */
-		    for (int i = 0; i < total_decompressed; i++)
-			    (*out)[i] = (char) bufout[i];
+		*out = bufout;
 
 #ifdef DEBUG_TRACE
-		    printf("pysapcompress.cpp: Out buffer:\n");
-			hexdump(*out, total_decompressed);
+		printf("pysapcompress.cpp: Out buffer:\n");
+		hexdump(*out, total_decompressed);
 #endif
-		/* Memory error */
-        } else {
-    		rt = CS_E_MEMORY_ERROR; *out_length = 0;
-        }
+	/* Free the buffer on errors */
+	} else {
+		free(bufout);
 	}
 
-	/* Free the buffers */
-	free(bufout);
-
 #ifdef DEBUG
 	printf("pysapcompress.cpp: Out Length: %d\n", *out_length);
 #endif
@@ -273,11 +260,10 @@ int compress_packet (const unsigned char *in, const int in_length, unsigned char
 	 * as the output buffer size.
 	 */
 	bufout_length = bufout_rest = bufin_length * MEMORY_ALLOC_FACTOR;
-	bufout = bufout_pos = (SAP_BYTE*) malloc(bufout_length);
+	bufout = bufout_pos = (SAP_BYTE*) calloc(bufout_length, 1);
 	if (!bufout){
 		return (CS_E_MEMORY_ERROR);
 	}
-	memset(bufout, 0, bufout_length);
 
 	/* Initialize */
 	rt = csObject.CsInitCompr(bufout, bufin_length, algorithm);
@@ -327,33 +313,20 @@ int compress_packet (const unsigned char *in, const int in_length, unsigned char
 		total_compressed += bytes_compressed;
 	}
 
-	/* Successful compression */
+	/* Successful compression, hand the output buffer to the caller */
 	if (rt == CS_END_OF_STREAM) {
 		*out_length = total_compressed;
-
-        /* Allocate the required memory */
-        *out = (unsigned char *)malloc(total_compressed);
-        if (*out){
-
-		    /* Copy the buffer in the out parameter */
-		    memcpy(*out, bufout, total_compressed);
-
-		    /* Set the compression header */
-		    csObject.CsSetHead(bufout, bufin_length, algorithm, 0);
+		*out = bufout;
 
 #ifdef DEBUG_TRACE
-		    printf("pysapcompress.cpp: Out buffer:\n");
-			hexdump(*out, total_compressed);
+		printf("pysapcompress.cpp: Out buffer:\n");
+		hexdump(*out, total_compressed);
 #endif
-		/* Memory error */
-        } else {
-        	rt = CS_E_MEMORY_ERROR; *out_length = 0;
-        }
+	/* Free the buffer on errors */
+	} else {
+		free(bufout);
 	}
 
-	/* Free the buffers */
-	free(bufout);
-
 #ifdef DEBUG
 	printf("pysapcompress.cpp: Out Length: %d\n", *out_length);
 #endif
@@ -362,8 +335,38 @@ int compress_packet (const unsigned char *in, const int in_length, unsigned char
 };
 
 
+/* Decompression of a packet buffer in a batch */
+typedef struct {
+	const unsigned char *in;
+	int in_length;
+	unsigned char *out;
+	int out_length;
+	int status;
+} decompress_item;
+
+
+/* Decompress a batch of packet buffers. Packets are decompressed in parallel
+ * when the module is built with OpenMP. Items with an error status already set
+ * are skipped.
+ */
+void decompress_packets (decompress_item *items, const Py_ssize_t count)
+{
+	Py_ssize_t i = 0;
+
+#ifdef _OPENMP
+	#pragma omp parallel for schedule(dynamic)
+#endif
+	for (i = 0; i < count; i++){
+		if (items[i].status < 0)
+			continue;
+		items[i].status = decompress_packet(items[i].in, items[i].in_length, &items[i].out, &items[i].out_length);
+	}
+};
+
+
 /* Compress Python function */
-static char pysapcompress_compress_doc[] = "Compress a buffer using SAP's compression algorithms.\n\n"
+static char pysapcompress_compress_doc[] = "Compress a buffer using SAP's compression algorithms. The GIL is\n"
+                                           "released while compressing.\n\n"
                                            ":param str in: input buffer to compress\n\n"
                                            ":param int algorithm: algorithm to use\n\n"
                                            ":return: tuple with return code, output length and output buffer\n"
@@ -375,6 +378,7 @@ pysapcompress_compress(PyObject *self, PyObject *args, PyObject *keywds)
 {
     const unsigned char *in = NULL;
     unsigned char *out = NULL;
+    PyObject *result = NULL;
     int status = 0, in_length = 0, out_length = 0, algorithm = ALG_LZC;
     Py_ssize_t in_length_arg = 0;
 
@@ -395,8 +399,10 @@ pysapcompress_compress(PyObject *self, PyObject *args, PyObject *keywds)
 	
 	in_length = Py_SAFE_DOWNCAST(in_length_arg, Py_ssize_t, int);
 
-    /* Call the compression function */
+    /* Call the compression function without holding the GIL */
+    Py_BEGIN_ALLOW_THREADS
     status = compress_packet(in, in_length, &out, &out_length, algorithm);
+    Py_END_ALLOW_THREADS
 
     /* Perform some exception handling */
     if (status < 0){
@@ -410,12 +416,15 @@ pysapcompress_compress(PyObject *self, PyObject *args, PyObject *keywds)
     }
 
     /* It no error was raised, return the compressed buffer and the length */
-	return (Py_BuildValue("iiy#", status, out_length, out, out_length));
+    result = Py_BuildValue("iiy#", status, out_length, out, (Py_ssize_t)out_length);
+    free(out);
+    return (result);
 }
 
 
 /* Decompress Python function */
-static char pysapcompress_decompress_doc[] = "Decompress a buffer using SAP's compression algorithms.\n\n"
+static char pysapcompress_decompress_doc[] = "Decompress a buffer using SAP's compression algorithms. The GIL is\n"
+                                             "released while decompressing.\n\n"
                                              ":param str in: input buffer to decompress\n"
                                              ":param int out_length: length of the output to decompress\n"
                                              ":return: tuple of return code, output length and output buffer\n"
@@ -427,6 +436,7 @@ pysapcompress_decompress(PyObject *self, PyObject *args)
 {
     const unsigned char *in = NULL;
     unsigned char *out = NULL;
+    PyObject *result = NULL;
     int status = 0, in_length = 0, out_length = 0;
 	Py_ssize_t in_length_arg = 0, out_length_arg = 0;
 
@@ -447,8 +457,10 @@ pysapcompress_decompress(PyObject *self, PyObject *args)
 	in_length = Py_SAFE_DOWNCAST(in_length_arg, Py_ssize_t, int);
 	out_length = Py_SAFE_DOWNCAST(out_length_arg, Py_ssize_t, int);
 
-    /* Call the compression function */
+    /* Call the decompression function without holding the GIL */
+    Py_BEGIN_ALLOW_THREADS
     status = decompress_packet(in, in_length, &out, &out_length);
+    Py_END_ALLOW_THREADS
 
     /* Perform some exception handling */
     if (status < 0){
@@ -460,7 +472,118 @@ pysapcompress_decompress(PyObject *self, PyObject *args)
     		return (PyErr_Format(decompression_exception, "Decompression error (%s)", error_string(status)));
     }
     /* It no error was raised, return the uncompressed buffer and the length */
-	return (Py_BuildValue("iiy#", status, out_length, out, out_length));
+    result = Py_BuildValue("iiy#", status, out_length, out, (Py_ssize_t)out_length);
+    free(out);
+    return (result);
+}
+
+
+/* Decompress many Python function */
+static char pysapcompress_decompress_many_doc[] = "Decompress several buffers using SAP's compression algorithms. The buffers\n"
+                                                  "are decompressed without holding the GIL, and in parallel when the module\n"
+                                                  "is built with OpenMP.\n\n"
+                                                  ":param list inputs: tuples of input buffer to decompress and length of the\n"
+                                                  "    output to decompress, as ``decompress`` arguments, or input buffers\n"
+                                                  "    to decompress to the length reported in their header\n"
+                                                  ":return: list of tuples of return code, output length and output buffer.\n"
+                                                  "    Buffers that can't be decompressed don't raise an exception, but\n"
+                                                  "    their tuple has a negative return code, zero length and no buffer\n"
+                                                  ":rtype: list of tuple of int, int, bytes\n\n"
+                                                  ":raises TypeError: if an input is not a buffer or a tuple\n";
+
+static PyObject *
+pysapcompress_decompress_many(PyObject *self, PyObject *args)
+{
+    PyObject *inputs = NULL, *sequence = NULL, *result = NULL, *item = NULL;
+    decompress_item *items = NULL;
+    Py_ssize_t count = 0, i = 0, in_length_arg = 0, out_length_arg = 0;
+    int status = 0;
+
+    /* Parse the parameters */
+    if (!PyArg_ParseTuple(args, "O", &inputs)) {
+        return (NULL);
+    }
+
+    /* Keep a reference to the inputs so the buffers are valid while decompressing */
+    sequence = PySequence_Tuple(inputs);
+    if (sequence == NULL) {
+        return (NULL);
+    }
+    count = PyTuple_Size(sequence);
+
+    items = (decompress_item *) PyMem_Calloc(count > 0 ? count : 1, sizeof(decompress_item));
+    if (items == NULL) {
+        Py_DECREF(sequence);
+        return (PyErr_NoMemory());
+    }
+
+    /* Parse each input as the decompress function parameters */
+    for (i = 0; i < count; i++) {
+        item = PyTuple_GetItem(sequence, i);
+        if (PyTuple_Check(item)) {
+            if (!PyArg_ParseTuple(item, "y#n", &items[i].in, &in_length_arg, &out_length_arg)) {
+                goto error;
+            }
+        }
+        /* Plain buffers are decompressed to the length reported in their header */
+        else if (PyArg_Parse(item, "y#", &items[i].in, &in_length_arg)) {
+            if (in_length_arg < CS_HEAD_SIZE) {
+                items[i].status = CS_E_IN_BUFFER_LEN;
+                continue;
+            }
+            out_length_arg = (Py_ssize_t)items[i].in[0] | ((Py_ssize_t)items[i].in[1] << 8) |
+                             ((Py_ssize_t)items[i].in[2] << 16) | ((Py_ssize_t)items[i].in[3] << 24);
+        }
+        else {
+            PyErr_SetString(PyExc_TypeError, "inputs must be buffers or tuples of input buffer and output length");
+            goto error;
+        }
+        /* Invalid lengths are reported on the item, which is not decompressed */
+        if (in_length_arg > INT_MAX) {
+            items[i].status = CS_E_IN_BUFFER_LEN;
+            continue;
+        }
+        if (out_length_arg > INT_MAX) {
+            items[i].status = CS_E_OUT_BUFFER_LEN;
+            continue;
+        }
+        items[i].in_length = Py_SAFE_DOWNCAST(in_length_arg, Py_ssize_t, int);
+        items[i].out_length = Py_SAFE_DOWNCAST(out_length_arg, Py_ssize_t, int);
+    }
+
+    /* Call the decompression function without holding the GIL */
+    Py_BEGIN_ALLOW_THREADS
+    decompress_packets(items, count);
+    Py_END_ALLOW_THREADS
+
+    /* Return the uncompressed buffers and their lengths, or the return code of the items that failed */
+    result = PyList_New(count);
+    if (result == NULL) {
+        goto error;
+    }
+    for (i = 0; i < count; i++) {
+        status = items[i].status;
+        if (status < 0)
+            item = Py_BuildValue("iiO", status, 0, Py_None);
+        else
+            item = Py_BuildValue("iiy#", status, items[i].out_length, items[i].out, (Py_ssize_t)items[i].out_length);
+        if (item == NULL) {
+            Py_CLEAR(result);
+            goto error;
+        }
+        if (PyList_SetItem(result, i, item) < 0) {
+            Py_CLEAR(result);
+            goto error;
+        }
+    }
+
+error:
+    for (i = 0; i < count; i++) {
+        free(items[i].out);
+    }
+    PyMem_Free(items);
+    Py_DECREF(sequence);
+    return (result);
 }
 
 
@@ -468,6 +591,7 @@ pysapcompress_decompress(PyObject *self, PyObject *args)
 static PyMethodDef pysapcompressMethods[] = {
     {"compress", (PyCFunction)pysapcompress_compress, METH_VARARGS | METH_KEYWORDS, pysapcompress_compress_doc},
     {"decompress", pysapcompress_decompress, METH_VARARGS, pysapcompress_decompress_doc},
+    {"decompress_many", pysapcompress_decompress_many, METH_VARARGS, pysapcompress_decompress_many_doc},
     {NULL, NULL, 0, NULL}
 };
 
@@ -475,6 +599,12 @@ static PyMethodDef pysapcompressMethods[] = {
 /* pysapcompress module doc string */
 static char pysapcompress_module_doc[] = "Library implementing SAP's LZH and LZC compression algorithms.";
 
+/* The module is built with hidden visibility, and Python versions before 3.9 don't export the
+ * module initialization function */
+#if defined(__GNUC__) && PY_VERSION_HEX < 0x03090000
+extern "C" __attribute__((visibility("default"))) PyObject *PyInit_pysapcompress(void);
+#endif
+
 /* Module initialization */
 PyMODINIT_FUNC PyInit_pysapcompress(void) {
     PyObject *module = NULL;
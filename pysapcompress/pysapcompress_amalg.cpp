@@ -0,0 +1,33 @@
+/*
+# encoding: utf-8
+# pysap - Python library for crafting SAP's network protocols packets
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# Author:
+#   Martin Gallo (@martingalloar)
+#   Code contributed by SecureAuth to the OWASP CBAS project
+#
+*/
+
+/*
+ * Amalgamation of the pysapcompress sources, built as a single translation unit
+ * so the compiler can inline the codec helpers into the (de)compression loops.
+ *
+ * The module source goes first, as Python.h must be included before any
+ * standard header.
+ */
+
+#include "pysapcompress.cpp"
+#include "vpa105CsObjInt.cpp"
+#include "vpa106cslzc.cpp"
+#include "vpa107cslzh.cpp"
+#include "vpa108csulzh.cpp"
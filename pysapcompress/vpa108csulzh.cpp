@@ -389,6 +389,7 @@ HUFTREE * CsObjectInt::AllocHufTree (unsigned size)
 }
 
 
+CS_CPU_DISPATCH
 int CsObjectInt::FlushOut (unsigned w)          /* number of bytes to flush */
 /*--------------------------------------------------------------------*/
 /* Do the equivalent of OUTB for the bytes Slide[0..w-1]. ............*/
@@ -426,6 +427,7 @@ int CsObjectInt::FlushOut (unsigned w)          /* number of bytes to flush */
 
 
 
+CS_CPU_DISPATCH
 int CsObjectInt::DecompCodes ( 
               int     *state,     /* state of last run ...............*/
               HUFTREE *tl,        /* literal/length decoder tables */
@@ -632,12 +634,22 @@ int CsObjectInt::DecompCodes (
           w += e;
           d += e;
         }
-        else                /* do it slow to avoid memcpy() overlap ..*/
+        else if (w == d)    /* distance of a whole window, no-op copy */
         {
+          w += e;
+          d += e;
+        }
+        else                /* overlapping copy, repeat the pattern ..*/
+        {                   /* in chunks of the distance to avoid ....*/
+          unsigned k;       /* memcpy() overlap ......................*/
+
           do
           {
-            cshu.Slide[w++] = cshu.Slide[d++];
-          } while (--e);
+            k = w - d > e ? e : w - d;
+            memcpy (cshu.Slide + w, cshu.Slide + d, k);
+            w += k;
+            d += k;
+          } while (e -= k);
         }
 
         if (w == WSIZE)
@@ -18,12 +18,20 @@
 #
 
 # Standard imports
-from setuptools import setup, Extension
-# Custom imports
-import pysap
+import os
+import sys
+import shutil
+import tempfile
+import sysconfig
+import subprocess
+from setuptools import setup, Command, Extension
+from setuptools.command.build_ext import build_ext
+from setuptools.errors import CompileError, LinkError, OptionError
 
 
 sapcompress_macros = [
+    # Release build of the (de)compression functions, even with interpreters built without NDEBUG
+    ('NDEBUG', None),
     # Enable this macro if you want some debugging information on the (de)compression functions
     # ('DEBUG', None),
     # Enable this macro if you want detailed debugging information (hexdumps) on the (de)compression functions
@@ -31,51 +39,214 @@ sapcompress_macros = [
 ]
 
 
+# The extension only uses the stable ABI, so a single abi3 module works with every Python version
+# since 3.7. Free-threaded interpreters don't support the limited API, and get a version-specific build.
+sapcompress_limited_api = not sysconfig.get_config_var("Py_GIL_DISABLED")
+if sapcompress_limited_api:
+    sapcompress_macros.append(("Py_LIMITED_API", "0x03070000"))
+
+
+# Per-compiler optimization flags for the (de)compression functions. The codecs perform type-punned
+# loads on the history buffer, so strict aliasing must stay disabled. The module and codec sources
+# are compiled as a single amalgamated translation unit, so the compiler can inline the helpers shared
+# between them. The codecs are plain C-style code, so they are built without exceptions and RTTI support.
+# Only the module initialization function is exported, so the calls between the codec functions don't
+# go through the PLT.
+linux = sys.platform.startswith("linux")
+
+sapcompress_compile_args = {
+    "unix": ["-std=c++17", "-fno-exceptions", "-fno-rtti",
+             "-O3", "-funroll-loops", "-fno-strict-aliasing", "-Wno-unused-function",
+             "-fvisibility=hidden", "-fvisibility-inlines-hidden"] + (["-fno-plt"] if linux else []),
+    "msvc": ["/std:c++17", "/EHs-c-", "/GR-", "/O2", "/GL"],
+}
+
+sapcompress_link_args = {
+    "unix": ["-Wl,-O1", "-Wl,--as-needed"] if linux else [],
+    "msvc": ["/LTCG"],
+}
+
+# Link-time optimization flags (GCC/Clang), only added when the toolchain can both compile and link
+# with them, as the linker might not support the compiler's LTO plugin
+sapcompress_lto_args = {
+    "unix": "-flto",
+}
+
+# Most of the build time is spent on the link-time optimization, which runs in parallel with these flags
+# when the compiler supports them
+sapcompress_parallel_link_args = {
+    "unix": "-flto=auto",
+}
+
+# Optional flags only added when the compiler supports them
+sapcompress_optional_compile_args = {
+    "unix": ["-fno-semantic-interposition"],
+}
+
+# Profile-guided optimization flags (GCC/Clang), the placeholder is replaced with the profile directory
+sapcompress_pgo_args = {
+    "generate": ["-fprofile-generate={}", "-fprofile-update=atomic"],
+    "use": ["-fprofile-use={}", "-fprofile-correction", "-Wno-missing-profile"],
+}
+
+# OpenMP flags used to decompress batches of buffers in parallel, enabled with the PYSAPCOMPRESS_OPENMP
+# environment variable as it requires the compiler's OpenMP runtime
+sapcompress_openmp = os.environ.get("PYSAPCOMPRESS_OPENMP") == "1"
+
+sapcompress_openmp_args = {
+    "unix": (["-fopenmp"], ["-fopenmp"]),
+    "msvc": (["/openmp:llvm"], []),
+}
+
+# Target instruction set for the (de)compression functions (e.g. "x86-64-v3" for GCC/Clang or
+# "AVX2" for MSVC). Left empty by default so the built module runs on any CPU of the platform.
+sapcompress_arch = os.environ.get("PYSAPCOMPRESS_ARCH")
+
+
+class sapcompress_build_ext(build_ext):
+    """Build extension command that adds the compiler specific flags for
+    the pysapcompress module.
+
+    Profile-guided builds are done in two steps: build with ``--pgo-generate``,
+    run ``extra/pgo_train.py`` with the instrumented module, and rebuild with
+    ``--pgo-use`` (and ``--force``) pointing to the same profile directory. The
+    ``build_pgo`` command runs all the steps.
+    """
+
+    user_options = build_ext.user_options + [
+        ("pgo-generate=", None, "build an instrumented module that writes its profile to the given directory"),
+        ("pgo-use=", None, "build the module optimized with the profile found in the given directory"),
+    ]
+
+    def initialize_options(self):
+        build_ext.initialize_options(self)
+        self.pgo_generate = None
+        self.pgo_use = None
+
+    def finalize_options(self):
+        build_ext.finalize_options(self)
+        if self.pgo_generate and self.pgo_use:
+            raise OptionError("--pgo-generate and --pgo-use are mutually exclusive")
+
+    def has_flag(self, flag):
+        """Checks if the compiler accepts a flag by compiling and linking an empty source file with it."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source = os.path.join(tmpdir, "flag.cpp")
+            with open(source, "w") as fd:
+                fd.write("int main(void) { return 0; }\n")
+            try:
+                objects = self.compiler.compile([source], output_dir=tmpdir, extra_postargs=[flag])
+                self.compiler.link_executable(objects, "flag", output_dir=tmpdir, extra_postargs=[flag],
+                                              target_lang="c++")
+            except (CompileError, LinkError):
+                return False
+        return True
+
+    def build_extensions(self):
+        compiler_type = self.compiler.compiler_type
+        compile_args = list(sapcompress_compile_args.get(compiler_type, []))
+        link_args = list(sapcompress_link_args.get(compiler_type, []))
+        macros = []
+        lto_arg = sapcompress_lto_args.get(compiler_type)
+        if lto_arg and self.has_flag(lto_arg):
+            compile_args.append(lto_arg)
+            parallel_arg = sapcompress_parallel_link_args.get(compiler_type)
+            link_args.append(parallel_arg if parallel_arg and self.has_flag(parallel_arg) else lto_arg)
+        compile_args.extend(arg for arg in sapcompress_optional_compile_args.get(compiler_type, [])
+                            if self.has_flag(arg))
+        if sapcompress_arch:
+            if compiler_type == "msvc":
+                compile_args.append("/arch:{}".format(sapcompress_arch))
+            else:
+                compile_args.append("-march={}".format(sapcompress_arch))
+
+        if sapcompress_openmp and compiler_type in sapcompress_openmp_args:
+            openmp_compile_args, openmp_link_args = sapcompress_openmp_args[compiler_type]
+            compile_args.extend(openmp_compile_args)
+            link_args.extend(openmp_link_args)
+
+        pgo_step, pgo_dir = ("generate", self.pgo_generate) if self.pgo_generate else ("use", self.pgo_use)
+        if pgo_dir:
+            if compiler_type != "unix":
+                raise OptionError("Profile-guided builds are only supported with GCC or Clang")
+            pgo_args = [arg.format(os.path.abspath(pgo_dir)) for arg in sapcompress_pgo_args[pgo_step]]
+            compile_args.extend(pgo_args)
+            link_args.extend(pgo_args)
+            # Instrumented ifunc resolvers run before relocation, so CPU dispatch is disabled on both steps
+            macros.append(("CS_NO_CPU_DISPATCH", None))
+
+        # Add the flags only for this build, as the extensions are shared between commands
+        original_args = [(extension, extension.extra_compile_args, extension.extra_link_args, extension.define_macros)
+                         for extension in self.extensions]
+        try:
+            for extension in self.extensions:
+                extension.extra_compile_args = compile_args + extension.extra_compile_args
+                extension.extra_link_args = link_args + extension.extra_link_args
+                extension.define_macros = extension.define_macros + macros
+            build_ext.build_extensions(self)
+        finally:
+            for extension, extra_compile_args, extra_link_args, define_macros in original_args:
+                extension.extra_compile_args = extra_compile_args
+                extension.extra_link_args = extra_link_args
+                extension.define_macros = define_macros
+
+
+class sapcompress_build_pgo(Command):
+    """Command that builds the pysapcompress module in-place with profile-guided
+    optimization. It builds an instrumented module, trains it with
+    ``extra/pgo_train.py`` and rebuilds it with the obtained profile.
+    """
+
+    description = "build the pysapcompress module in-place with profile-guided optimization"
+
+    user_options = [
+        ("pgo-dir=", None, "directory to store the profile [default: build/pgo]"),
+    ]
+
+    def initialize_options(self):
+        self.pgo_dir = None
+
+    def finalize_options(self):
+        if self.pgo_dir is None:
+            self.pgo_dir = os.path.join("build", "pgo")
+
+    def run(self):
+        # Start from an empty profile so stale counters are not merged
+        if os.path.isdir(self.pgo_dir):
+            shutil.rmtree(self.pgo_dir)
+
+        self.build(pgo_generate=self.pgo_dir)
+        self.announce("training the instrumented pysapcompress module", level=2)
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")])))
+        subprocess.check_call([sys.executable, os.path.join("extra", "pgo_train.py")], env=env)
+        self.build(pgo_use=self.pgo_dir)
+
+    def build(self, **pgo_options):
+        build_ext_command = self.reinitialize_command("build_ext")
+        build_ext_command.inplace = True
+        build_ext_command.force = True
+        for option, value in pgo_options.items():
+            setattr(build_ext_command, option, value)
+        self.run_command("build_ext")
+
+
 sapcompress = Extension('pysapcompress',
-                        ['pysapcompress/pysapcompress.cpp',
-                         'pysapcompress/vpa105CsObjInt.cpp',
-                         'pysapcompress/vpa106cslzc.cpp',
-                         'pysapcompress/vpa107cslzh.cpp',
-                         'pysapcompress/vpa108csulzh.cpp'],
-                        define_macros=sapcompress_macros)
-
-
-with open("README.md", "r") as fh:
-    long_description = fh.read()
-
-
-setup(name=pysap.__title__,  # Package information
-      version=pysap.__version__,
-      author='Martin Gallo, OWASP CBAS Project',
-      author_email='martin.gallo@gmail.com',
-      description='Python library for crafting SAP\'s network protocols packets',
-      long_description=long_description,
-      long_description_content_type="text/markdown",
-      url=pysap.__url__,
-      download_url=pysap.__url__,
-      license=pysap.__license__,
-      classifiers=['Development Status :: 3 - Alpha',
-                   'Intended Audience :: Developers',
-                   'Intended Audience :: Information Technology',
-                   'Intended Audience :: System Administrators',
-                   'License :: OSI Approved :: GNU General Public License v2 or later (GPLv2+)',
-                   'Programming Language :: Python',
-                   'Programming Language :: C++',
-                   'Topic :: Security'],
-      # Packages list
+                        ['pysapcompress/pysapcompress_amalg.cpp'],
+                        define_macros=sapcompress_macros,
+                        py_limited_api=sapcompress_limited_api)
+
+
+# Package metadata and requirements are declared in pyproject.toml
+setup(# Packages list
       packages=['pysap', 'pysap.utils', 'pysap.utils.crypto'],
       provides=['pysapcompress', 'pysap'],
 
       # Extension module compilation
       ext_modules=[sapcompress],
+      cmdclass={"build_ext": sapcompress_build_ext,
+                "build_pgo": sapcompress_build_pgo},
+      options={"bdist_wheel": {"py_limited_api": "cp37"}} if sapcompress_limited_api else {},
 
       # Script files
       scripts=['bin/pysapcar', 'bin/pysapgenpse'],
-
-      # Requirements
-      install_requires=open('requirements.txt').read().splitlines(),
-
-      # Optional requirements for docs and some examples
-      extras_require={"docs": open('requirements-docs.txt').read().splitlines(),
-                      "examples": open('requirements-examples.txt').read().splitlines()},
       )
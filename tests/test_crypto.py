@@ -51,6 +51,8 @@ class PySAPCryptoUtilsTest(unittest.TestCase):
         scrambled_salt = scram.scramble_salt(password, salt, server_key, client_key)
         self.assertEqual(len(expected_scrambled_salt), len(scrambled_salt))
         self.assertEqual(expected_scrambled_salt, scrambled_salt)
+        self.assertEqual(expected_scrambled_salt, scram.scramble_salt(password, memoryview(salt),
+                                                                      memoryview(server_key), client_key))
 
     def test_scram_pbkdf2sha256_scramble_salt(self):
         """Test SCRAM-PBKDF2-SHA256 scramble salt calculation.
@@ -69,6 +71,8 @@ class PySAPCryptoUtilsTest(unittest.TestCase):
         scrambled_salt = scram.scramble_salt(password, salt, server_key, client_key, rounds)
         self.assertEqual(len(expected_scrambled_salt), len(scrambled_salt))
         self.assertEqual(expected_scrambled_salt, scrambled_salt)
+        self.assertEqual(expected_scrambled_salt, scram.scramble_salt(password, memoryview(salt),
+                                                                      memoryview(server_key), client_key, rounds))
 
 
 if __name__ == "__main__":
@@ -96,6 +96,20 @@ class PySAPCompressTest(unittest.TestCase):
         self.assertEqual(out_length_decompressed, len(self.test_string_plain))
         self.assertEqual(out_decompressed, self.test_string_plain)
 
+    def test_lzh_overlapping_matches(self):
+        """Test decompression using LZH algorithm of matches overlapping
+        their distance, including matches spanning several windows"""
+        from pysapcompress import compress, decompress, ALG_LZH
+        for pattern in [b"A", b"AB", b"ABC", b"ABCDEFG", b"0123456789ABCDEFG"]:
+            plain = (pattern * (40000 // len(pattern)) + b"END") * 2
+            _, _, out_compressed = compress(plain, ALG_LZH)
+
+            status, out_length_decompressed, out_decompressed = decompress(out_compressed, len(plain))
+
+            self.assertTrue(status)
+            self.assertEqual(out_length_decompressed, len(plain))
+            self.assertEqual(out_decompressed, plain)
+
     def test_login_screen(self):
         """Test (de)compression of a login screen packet. The result is
         compared with data obtained from SAP GUI."""
@@ -150,6 +164,64 @@ class PySAPCompressTest(unittest.TestCase):
         self.assertEqual(out_length, len(login_decompressed))
         self.assertEqual(decompressed, login_decompressed)
 
+    def test_decompress_many(self):
+        """Test decompression of several buffers at once"""
+        from pysapcompress import decompress_many
+        login_compressed = read_data_file('sapgui_730_login_compressed.data')
+        login_decompressed = read_data_file('sapgui_730_login_decompressed.data')
+
+        results = decompress_many([(self.test_string_compr_lzc, len(self.test_string_plain)),
+                                   (self.test_string_compr_lzh, len(self.test_string_plain)),
+                                   (login_compressed, len(login_decompressed))])
+
+        self.assertEqual(3, len(results))
+        for (status, out_length, out_decompressed), expected in zip(results, [self.test_string_plain,
+                                                                               self.test_string_plain,
+                                                                               login_decompressed]):
+            self.assertTrue(status)
+            self.assertEqual(out_length, len(expected))
+            self.assertEqual(out_decompressed, expected)
+
+        results = decompress_many([self.test_string_compr_lzc, self.test_string_compr_lzh, login_compressed])
+
+        self.assertEqual([(True, len(self.test_string_plain), self.test_string_plain),
+                          (True, len(self.test_string_plain), self.test_string_plain),
+                          (True, len(login_decompressed), login_decompressed)],
+                         [(bool(status), out_length, out_decompressed)
+                          for status, out_length, out_decompressed in results])
+
+        self.assertEqual([], decompress_many([]))
+        self.assertRaises(TypeError, decompress_many, [1])
+
+        # Errors are reported on each item without affecting the rest
+        results = decompress_many([b"\x18\x01", (self.test_string_compr_lzh, len(self.test_string_plain)),
+                                   (b"AAAAAAAA", 1), self.test_string_compr_lzc])
+        self.assertEqual(4, len(results))
+        self.assertEqual((0, None), results[0][1:])
+        self.assertLess(results[0][0], 0)
+        self.assertTrue(results[1][0] > 0)
+        self.assertEqual(self.test_string_plain, results[1][2])
+        self.assertEqual((0, None), results[2][1:])
+        self.assertLess(results[2][0], 0)
+        self.assertTrue(results[3][0] > 0)
+        self.assertEqual(self.test_string_plain, results[3][2])
+
+    def test_threads(self):
+        """Test (de)compression from several threads at once"""
+        from concurrent.futures import ThreadPoolExecutor
+        from pysapcompress import compress, decompress, ALG_LZC, ALG_LZH
+        login_decompressed = read_data_file('sapgui_730_login_decompressed.data')
+
+        def roundtrip(algorithm):
+            _, _, compressed = compress(login_decompressed, algorithm)
+            return decompress(compressed, len(login_decompressed))[2]
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(roundtrip, [ALG_LZC, ALG_LZH] * 8))
+
+        for decompressed in results:
+            self.assertEqual(decompressed, login_decompressed)
+
     def test_invalid_write(self):
         """Test invalid write vulnerability in LZC code (CVE-2015-2282)"""
         from pysapcompress import decompress, DecompressError
@@ -22,6 +22,7 @@ import unittest
 from os import unlink, rmdir, path
 # External imports
 # Custom imports
+from pysapcompress import DecompressError
 from tests.utils import data_filename
 from pysap.SAPCAR import (SAPCARArchive, SAPCARArchiveFile, SAPCARArchiveFilev200Format, SAPCARArchiveFilev201Format,
                           SAPCAR_VERSION_200, SAPCAR_VERSION_201, SIZE_FOUR_GB)
@@ -131,6 +132,38 @@ class PySAPCARTest(unittest.TestCase):
         ar.write()
         ar.close()
 
+    def test_sapcar_archive_open_files(self):
+        """Test opening several files of a SAP CAR archive at once"""
+
+        ar = SAPCARArchive(self.test_archive_file, "w")
+        ar.add_file(self.test_filename)
+        ar.add_file(self.test_filename, archive_filename=self.test_filename+"two")
+
+        afs = dict(ar.open_files(enforce_checksum=True))
+        self.assertListEqual([self.test_filename, self.test_filename+"two"], sorted(afs.keys()))
+        for af in afs.values():
+            self.assertEqual(self.test_string, af.read())
+            af.close()
+
+        afs = list(ar.open_files([self.test_filename+"two", self.test_filename]))
+        self.assertListEqual([self.test_filename+"two", self.test_filename], [filename for filename, _ in afs])
+        self.assertEqual(self.test_string, afs[0][1].read())
+
+        # Files are decompressed in batches of at most the given length, and each in its own batch here
+        afs = list(ar.open_files(batch_length=1))
+        self.assertEqual(2, len(afs))
+        for _, af in afs:
+            self.assertEqual(self.test_string, af.read())
+
+        # Errors are returned in place of the file that couldn't be opened
+        ar._files[0].blocks[0].compressed.magic_bytes = b"AA"
+        afs = dict(ar.open_files())
+        self.assertIsInstance(afs[self.test_filename], DecompressError)
+        self.assertEqual(self.test_string, afs[self.test_filename+"two"].read())
+
+        self.assertRaises(Exception, ar.open_files, ["invalid"])
+        ar.close()
+
     def test_sapcar_archive_file_from_file(self):
         """Test SAP CAR archive file object construction from file using the original name
         and a different one"""
@@ -18,30 +18,343 @@
 
 # Standard imports
 import sys
+import asyncio
+import ssl
+import socket
+import struct
 import unittest
+from time import sleep
 from threading import Thread
 from socketserver import BaseRequestHandler, ThreadingTCPServer
+# External imports
+from scapy.packet import Raw
 # Custom imports
-from pysap.SAPHDB import SAPHDBConnection
+from tests.utils import data_filename
+from pysap.SAPHDB import (SAPHDB, SAPHDBSegment, SAPHDBPart, SAPHDBPartAuthentication, SAPHDBPartAuthenticationField,
+                          SAPHDBPartClientId, SAPHDBPartClientContext, SAPHDBPartConnectOptions,
+                          SAPHDBAuthJWTMethod, SAPHDBAuthScramMethod, SAPHDBAuthScramSHA256Method,
+                          SAPHDBAuthScramPBKDF2SHA256Method, SAPHDBConnection, SAPHDBTLSConnection,
+                          SAPHDBAsyncConnection, SAPHDBAsyncTLSConnection,
+                          SAPHDBConnectionError, SAPHDBInitializationRequest, hdb_initialization_request,
+                          hdb_split_packets, hdb_build_part, hdb_build_request, hdb_parse_auth_fields,
+                          saphdb_auth_methods)
 
 
 class SAPHDBServerTestHandler(BaseRequestHandler):
     """Basic SAP HDB server that performs initialization."""
 
-    def handle_data(self):
+    def handle(self):
         self.request.recv(14)
-        self.request.send("\x00" * 8)
+        self.request.send(b"\x00" * 8)
 
 
-class PySAPHDBConnectionTest(unittest.TestCase):
+class PySAPHDBTest(unittest.TestCase):
+
+    def test_saphdb_enum_fields(self):
+        """Test HDB enum fields conversion from and to names"""
+        segment = SAPHDBSegment(segmentkind="Request", messagetype="AUTHENTICATE")
+        self.assertEqual(1, segment.segmentkind)
+        self.assertEqual(65, segment.messagetype)
+        self.assertEqual("AUTHENTICATE", segment.get_field("messagetype").i2repr(segment, segment.messagetype))
+
+        segment = SAPHDBSegment(segmentkind="Reply", functioncode="DISCONNECT")
+        self.assertEqual(2, segment.segmentkind)
+        self.assertEqual(18, segment.functioncode)
+
+        part = SAPHDBPart(partkind="AUTHENTICATION")
+        self.assertEqual(33, part.partkind)
+
+    def test_saphdb_initialization_request(self):
+        """Test HDB Initialization Request packet"""
+        self.assertEqual(b"\xff\xff\xff\xff\x04\x20\x00\x04\x01\x00\x00\x01\x01\x01", hdb_initialization_request)
+        self.assertEqual(hdb_initialization_request, bytes(SAPHDBInitializationRequest()))
+
+    def test_saphdb_split_packets(self):
+        """Test HDB splitting of consecutive packets"""
+        packets = [bytes(SAPHDB(segments=[SAPHDBSegment(messagetype=65)])),
+                   bytes(SAPHDB()),
+                   bytes(SAPHDB(segments=[SAPHDBSegment(segmentkind=2, functioncode=18)]))]
+        data = b"".join(packets)
+
+        self.assertEqual(packets, list(hdb_split_packets(data)))
+        self.assertEqual(packets[:2], list(hdb_split_packets(data[:-1])))
+        self.assertEqual([], list(hdb_split_packets(data[:31])))
+
+    def test_saphdb_build_request(self):
+        """Test HDB building of raw requests without crafting the packets"""
+        for buffer in [b"", b"A", b"B" * 8, b"C" * 0x101]:
+            part = SAPHDBPart(partkind=33, argumentcount=1, buffer=Raw(buffer))
+            self.assertEqual(bytes(part), hdb_build_part(33, buffer))
+            self.assertEqual(bytes(SAPHDB(segments=[SAPHDBSegment(messagetype=65, parts=[part, part])])),
+                             hdb_build_request(65, [hdb_build_part(33, buffer)] * 2))
+        self.assertEqual(bytes(SAPHDB(segments=[SAPHDBSegment(messagetype=77)])), hdb_build_request(77, []))
+
+        connection = SAPHDBConnection("127.0.0.1", 30017, app_name="A" * 0x101)
+        self.assertEqual(bytes(connection.craft_client_context_part()), connection.craft_client_context_part_raw())
+
+        auth_part = SAPHDBAuthJWTMethod("username", "jwt").craft_authentication_response_part(None, "value")
+        connect_request = SAPHDB(segments=[SAPHDBSegment(messagetype=66, parts=[
+            SAPHDBPart(partkind=29),
+            auth_part,
+            SAPHDBPart(partkind=35, buffer=SAPHDBPartClientId(clientid=connection.client_id))])])
+        self.assertEqual(bytes(connect_request), bytes(connection.craft_connect_request(auth_part)))
+        self.assertEqual(bytes(SAPHDB(segments=[SAPHDBSegment(messagetype=77)])),
+                         bytes(connection.craft_disconnect_request()))
+
+    def test_saphdb_option_part_row_fields_cache(self):
+        """Test HDB Option Part Rows fields are initialized from the class cache"""
+        self.assertIs(SAPHDBPartClientContext().fieldtype, SAPHDBPartClientContext().fieldtype)
+        self.assertIsNot(SAPHDBPartClientContext().fieldtype, SAPHDBPartConnectOptions().fieldtype)
+
+        row = SAPHDBPartClientContext(key=1, type=29, value="pysap")
+        self.assertEqual(b"\x01\x1d\x05\x00pysap", bytes(row))
+        self.assertEqual(b"pysap", SAPHDBPartClientContext(bytes(row)).value)
+        self.assertEqual(b"\x01\x03\x05\x00\x00\x00", bytes(SAPHDBPartConnectOptions(key=1, type=3, value=5)))
+
+    def test_saphdb_lazy_dissection(self):
+        """Test HDB dissection of segments and parts on access"""
+        connection = SAPHDBConnection("127.0.0.1", 30017)
+        packet = SAPHDB(segments=[SAPHDBSegment(messagetype=66,
+                                                parts=[SAPHDBPart(partkind=29),
+                                                       connection.craft_client_context_part()]),
+                                  SAPHDBSegment(segmentkind=5)])
+        raw = bytes(packet)
+
+        dissected = SAPHDB(raw)
+        self.assertEqual(2, len(dissected.segments))
+        self.assertEqual(raw, bytes(dissected))
+        self.assertEqual(raw, bytes(dissected.copy()))
+        self.assertEqual(SAPHDB(raw).show(dump=True), dissected.show(dump=True))
+
+        self.assertEqual(5, dissected.segments[-1].segmentkind)
+        self.assertEqual(2, dissected.segments[0].noofparts)
+        self.assertEqual([29, 29], [part.partkind for part in dissected.segments[0].parts])
+        self.assertEqual(b"pysap", dissected.segments[0].parts[1].buffer[2].value)
+
+        dissected.segments[0].parts[0].partkind = 35
+        self.assertNotEqual(raw, bytes(dissected))
+
+    def test_saphdb_lazy_dissection_list(self):
+        """Test HDB lists of segments dissected on access behave as lists of packets"""
+        raw = bytes(SAPHDB(segments=[SAPHDBSegment(segmentkind=5), SAPHDBSegment(segmentkind=2, functioncode=18)]))
+        first, second = SAPHDB(raw).segments
+
+        self.assertIsInstance(SAPHDB(raw).segments.pop(), SAPHDBSegment)
+        self.assertEqual(5, SAPHDB(raw).segments.pop(0).segmentkind)
+
+        for concatenated in [SAPHDB(raw).segments + [], [] + SAPHDB(raw).segments, SAPHDB(raw).segments * 1]:
+            self.assertEqual([SAPHDBSegment] * 2, [type(segment) for segment in concatenated])
+            self.assertEqual([first, second], concatenated)
+        segments = SAPHDB(raw).segments
+        segments += SAPHDB(raw).segments
+        self.assertEqual([first, second, first, second], list(segments))
+        self.assertIsInstance(list.__getitem__(segments, 3), SAPHDBSegment)
+
+        self.assertIn(second, SAPHDB(raw).segments)
+        self.assertNotIn(SAPHDBSegment(segmentkind=3), SAPHDB(raw).segments)
+        self.assertEqual(1, SAPHDB(raw).segments.index(second))
+        self.assertEqual(1, SAPHDB(raw).segments.count(first))
+
+        segments = SAPHDB(raw).segments
+        segments.remove(first)
+        self.assertEqual([second], segments)
+        segments = SAPHDB(raw).segments
+        segments.sort(key=lambda segment: segment.segmentkind)
+        self.assertEqual([2, 5], [segment.segmentkind for segment in segments])
+        segments[1:] = SAPHDB(raw).segments
+        self.assertEqual([SAPHDBSegment] * 3, [type(list.__getitem__(segments, i)) for i in range(3)])
+
+    def test_saphdb_lazy_dissection_malformed(self):
+        """Test HDB dissection of segments and parts with invalid lengths"""
+        raw = bytes(SAPHDB(segments=[SAPHDBSegment(segmentkind=2, functioncode=18,
+                                                   parts=[SAPHDBPart(partkind=33, buffer=b"ABCDEFGHIJK")]),
+                                     SAPHDBSegment(segmentkind=2, parts=[SAPHDBPart(partkind=3)])]))
+
+        # First part's buffer length past the end of the packet, it takes the following segment
+        corrupted = raw[:64] + struct.pack("<i", 200) + raw[68:]
+        dissected = SAPHDB(corrupted)
+        self.assertEqual(corrupted, bytes(dissected))
+        self.assertEqual(1, len(dissected.segments))
+        self.assertIsInstance(dissected.segments[0], SAPHDBSegment)
+        self.assertEqual(200, dissected.segments[0].parts[0].bufferlength)
+
+        # Negative buffer length
+        corrupted = raw[:64] + struct.pack("<i", -8) + raw[68:]
+        dissected = SAPHDB(corrupted)
+        self.assertEqual(corrupted, bytes(dissected))
+        self.assertEqual(2, len(dissected.segments))
+        self.assertEqual([1, 0], [len(segment.parts) for segment in dissected.segments])
+
+        # Truncated packet
+        truncated = raw[:-10]
+        dissected = SAPHDB(truncated)
+        self.assertEqual(truncated, bytes(dissected))
+        self.assertEqual(2, len(dissected.segments))
+        self.assertEqual([1, 1], [len(segment.parts) for segment in dissected.segments])
+        self.assertIsInstance(dissected.segments[1].parts[0], Raw)
+
+
+class PySAPHDBAuthMethodTest(unittest.TestCase):
+
+    def craft_auth_part(self, username, method, value):
+        auth_fields = SAPHDBPartAuthentication(auth_fields=[SAPHDBPartAuthenticationField(value=username),
+                                                            SAPHDBPartAuthenticationField(value=method),
+                                                            SAPHDBPartAuthenticationField(value=value)])
+        return SAPHDBPart(partkind=33, argumentcount=1, buffer=auth_fields)
+
+    def test_saphdbauthmethod_craft_authentication_fields(self):
+        """Test HDB Authentication Method crafting of cached authentication fields"""
+        auth_method = SAPHDBAuthJWTMethod("username", "A" * 0x100)
+
+        for value in ["", "value", "B" * 0xf0, "C" * 0xf1]:
+            auth_part = auth_method.craft_authentication_response_part(None, value)
+            self.assertEqual(bytes(self.craft_auth_part("username", "JWT", value)), bytes(auth_part))
+
+        auth_method.username = "another"
+        auth_part = auth_method.craft_authentication_response_part(None, "value")
+        self.assertEqual(bytes(self.craft_auth_part("another", "JWT", "value")), bytes(auth_part))
+
+    def test_saphdbauthmethod_is_method(self):
+        """Test HDB Authentication Method check of method name"""
+        auth_method = SAPHDBAuthJWTMethod("username", "jwt")
+        self.assertTrue(auth_method.is_method(b"JWT"))
+        self.assertTrue(auth_method.is_method("JWT"))
+        self.assertFalse(auth_method.is_method(b"SAML"))
+        self.assertFalse(auth_method.is_method(b""))
+
+    def test_saphdbauthmethod_slots(self):
+        """Test HDB Authentication Methods don't create per-instance dicts"""
+        for method_class in saphdb_auth_methods.values():
+            auth_method = method_class("username", None)
+            self.assertFalse(hasattr(auth_method, "__dict__"), method_class.__name__)
+
+    def test_saphdbauthmethod_parse_auth_fields(self):
+        """Test HDB Authentication Part parsing of field values"""
+        values = [b"username", b"", b"A" * 0xf0, b"B" * 0xf1, b"C" * 0x1000]
+        raw_part = bytes(SAPHDBPartAuthentication(auth_fields=[SAPHDBPartAuthenticationField(value=value)
+                                                               for value in values]))
+
+        self.assertEqual(hdb_parse_auth_fields(raw_part), values)
+        self.assertTrue(all(isinstance(value, memoryview) and value.obj is raw_part
+                            for value in hdb_parse_auth_fields(raw_part)))
+        self.assertEqual(hdb_parse_auth_fields(raw_part),
+                         [field.value for field in SAPHDBPartAuthentication(raw_part).auth_fields])
+        self.assertEqual(hdb_parse_auth_fields(b""), [])
+        self.assertEqual(hdb_parse_auth_fields(raw_part[:14]), [b"username", b"", b"A"])
+
+    def test_saphdbauthscrammethod_craft_authentication_request(self):
+        """Test HDB SCRAM Authentication Method crafting of the authentication request"""
+        auth_method = SAPHDBAuthScramSHA256Method("username", "password")
+        scram = auth_method.scram
+
+        auth_request = SAPHDB(bytes(auth_method.craft_authentication_request()))
+        auth_fields = auth_request.segments[0].parts[0].buffer[0].auth_fields
+        self.assertEqual(b"username", auth_fields[0].value)
+        self.assertEqual(b"SCRAMSHA256", auth_fields[1].value)
+        self.assertEqual(auth_method.client_key, auth_fields[2].value)
+        self.assertEqual(scram.CLIENT_KEY_SIZE, len(auth_method.client_key))
+
+        # A new client key is obtained for each request, using the same SCRAM object
+        client_key = auth_method.client_key
+        auth_method.craft_authentication_request()
+        self.assertNotEqual(client_key, auth_method.client_key)
+        self.assertIs(scram, auth_method.scram)
+
+    def test_saphdbauthscrammethod_scram_class(self):
+        """Test HDB SCRAM Authentication Method requires a SCRAM algorithm"""
+        self.assertRaisesRegex(ValueError, "SAPHDBAuthScramMethod doesn't define a SCRAM algorithm",
+                               SAPHDBAuthScramMethod, "username", "password")
+        self.assertIsNotNone(SAPHDBAuthScramSHA256Method("username", "password").scram)
+
+    def test_saphdbauthscrammethod_obtain_client_proof(self):
+        """Test HDB SCRAM-PBKDF2-SHA256 Authentication Method client proof calculation.
+
+        Values are taken from https://github.com/SAP/go-hdb/blob/master/internal/protocol/authentication_test.go
+        """
+        salt = b"3\xb2\xd5\xd5\\R\xc2(Px\xc5[\xa6C\x17?"
+        server_key = b" [\xa5\x12\x9eM\x86E\x80\x9dE\xd1/!\xab\xa48\xac\xe5\x00\x99\x03A\x1d\xef\xd2\xba\x86Q \x1d\x89\xef\xa7'\x01\xabuU\x8am&*M+*RF"
+        client_key = b'\x89\x9c\xb6<\x9e\x8a]gP\xca6\xbf\xd2N\x8e\xcf\xd2\xb0\x9d\x81\x80\x13\x87\x00\x7f\x1a:\xc5\xbc\xd8y\x1ax\xc4"\x8a\x05\x08: $\xf0\xc7~\xa4p@#.f\xff\xf9~\xfa\x18g\xc6\x98!K\x06\xb3\xbb\xe6'
+        expected_client_proof = b"\x00\x01\x20" \
+                                b'\xfd\xb5e\x00\xd6\xde\x19cb\xfd\x8dj&\xff\x10\x99"J\xd3F\x15[G\xdf\xaa$\xf9|\x01\x87\xb0%'
+
+        server_challenge = SAPHDBPartAuthentication(auth_fields=[SAPHDBPartAuthenticationField(value=salt),
+                                                                 SAPHDBPartAuthenticationField(value=server_key),
+                                                                 SAPHDBPartAuthenticationField(value=b"\x00\x00\x3a\x98")])
+        auth_response_part = SAPHDBPartAuthentication(bytes(SAPHDBPartAuthentication(
+            auth_fields=[SAPHDBPartAuthenticationField(value="SCRAMPBKDF2SHA256"),
+                         SAPHDBPartAuthenticationField(value=server_challenge)])))
+
+        auth_method = SAPHDBAuthScramPBKDF2SHA256Method("username", "Toor1234")
+        client_proof = auth_method.obtain_client_proof(auth_method.scram, client_key, auth_response_part)
+        self.assertEqual(expected_client_proof, client_proof)
+
+
+class SAPHDBServerReplyTestHandler(BaseRequestHandler):
+    """Basic SAP HDB server that sends a disconnect reply."""
+
+    reply = SAPHDB(segments=[SAPHDBSegment(segmentkind=2, functioncode=18)])
+
+    def handle(self):
+        self.request.sendall(bytes(self.reply))
+
+
+class SAPHDBServerFragmentedReplyTestHandler(SAPHDBServerReplyTestHandler):
+    """Basic SAP HDB server that sends a disconnect reply in fragments."""
+
+    def handle(self):
+        reply = bytes(self.reply)
+        for i in range(0, len(reply), 20):
+            self.request.sendall(reply[i:i + 20])
+            sleep(0.01)
+
+
+class SAPHDBServerJWTAuthTestHandler(BaseRequestHandler):
+    """Basic SAP HDB server that performs initialization and a JWT authentication."""
+
+    def recv_packet(self):
+        header = self.request.recv(32, socket.MSG_WAITALL)
+        varpartlength = struct.unpack_from("<I", header, 12)[0]
+        return SAPHDB(header + self.request.recv(varpartlength, socket.MSG_WAITALL))
+
+    def reply_auth_fields(self, values):
+        auth_part = SAPHDBPartAuthentication(auth_fields=[SAPHDBPartAuthenticationField(value=value)
+                                                          for value in values])
+        reply = SAPHDB(segments=[SAPHDBSegment(segmentkind=2, parts=[SAPHDBPart(partkind=33, buffer=auth_part)])])
+        self.request.sendall(bytes(reply))
+
+    def handle(self):
+        if self.request.recv(14, socket.MSG_WAITALL) != hdb_initialization_request:
+            return
+        self.request.sendall(b"\x04\x20\x00\x04\x01\x00\x00\x00")
+        self.recv_packet()
+        self.reply_auth_fields([b"JWT", b""])
+        self.recv_packet()
+        self.reply_auth_fields([b"JWT", b"cookie"])
+
+
+class SAPHDBTLSTestServer(ThreadingTCPServer):
+    """Basic TLS server, wrapping the connections with the same TLS context so sessions can be resumed."""
+
+    def __init__(self, *args, **kwargs):
+        super(SAPHDBTLSTestServer, self).__init__(*args, **kwargs)
+        self.context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        self.context.load_cert_chain(data_filename("hdb_tls_test.crt"), data_filename("hdb_tls_test.key"))
+
+    def get_request(self):
+        request, client_address = super(SAPHDBTLSTestServer, self).get_request()
+        return self.context.wrap_socket(request, server_side=True), client_address
+
+
+class SAPHDBServerTestCase(unittest.TestCase):
 
     test_port = 30017
     test_address = "127.0.0.1"
+    server_cls = ThreadingTCPServer
 
     def start_server(self, address, port, handler_cls):
-        self.server = ThreadingTCPServer((address, port),
-                                         handler_cls,
-                                         bind_and_activate=False)
+        self.server = self.server_cls((address, port),
+                                      handler_cls,
+                                      bind_and_activate=False)
         self.server.allow_reuse_address = True
         self.server.server_bind()
         self.server.server_activate()
@@ -54,13 +367,256 @@ class PySAPHDBConnectionTest(unittest.TestCase):
         self.server.server_close()
         self.server_thread.join(1)
 
+
+class PySAPHDBConnectionTest(SAPHDBServerTestCase):
+
     def test_saphdbconnection_initialize(self):
         """Test HDB Connection initialize"""
         self.start_server(self.test_address, self.test_port, SAPHDBServerTestHandler)
 
         client = SAPHDBConnection(self.test_address, self.test_port)
+        client.connect()
+        self.assertTrue(client._stream_socket.ins.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY))
+        client.initialize()
+
+        self.stop_server()
+
+    def test_saphdbconnection_not_connected(self):
+        """Test HDB Connection methods requiring a connection"""
+        client = SAPHDBConnection(self.test_address, self.test_port)
+        self.assertRaises(SAPHDBConnectionError, client.send, SAPHDB())
+        self.assertRaises(SAPHDBConnectionError, client.sr, SAPHDB())
+        self.assertRaises(SAPHDBConnectionError, client.recv)
+        self.assertRaises(SAPHDBConnectionError, client.recv_raw)
+        self.assertRaises(SAPHDBConnectionError, client.initialize)
+        self.assertRaises(SAPHDBConnectionError, client.authenticate)
+
+    def test_saphdbconnection_recv(self):
+        """Test HDB Connection receive"""
+        self.check_saphdbconnection_recv(SAPHDBServerReplyTestHandler)
+
+    def test_saphdbconnection_recv_fragmented(self):
+        """Test HDB Connection receive of fragmented packets"""
+        self.check_saphdbconnection_recv(SAPHDBServerFragmentedReplyTestHandler)
+
+    def test_saphdbconnection_authenticate(self):
+        """Test HDB Connection authentication"""
+        self.start_server(self.test_address, self.test_port, SAPHDBServerJWTAuthTestHandler)
+
+        client = SAPHDBConnection(self.test_address, self.test_port, SAPHDBAuthJWTMethod("username", "jwt"))
+        client.connect_authenticate()
+        self.assertEqual(4, client.product_version)
+        self.assertEqual(b"cookie", client.auth_method.session_cookie)
+
+        client.close_socket()
+        self.stop_server()
+
+    def check_saphdbconnection_recv(self, handler_cls):
+        self.start_server(self.test_address, self.test_port, handler_cls)
+
+        client = SAPHDBConnection(self.test_address, self.test_port)
+        client.connect()
+        reply = client.recv()
+
+        self.assertEqual(bytes(SAPHDBServerReplyTestHandler.reply), bytes(reply))
+        self.assertEqual(1, reply.noofsegm)
+        self.assertEqual(18, reply.segments[0].functioncode)
+        # The server closed the connection after the reply
+        self.assertRaises(SAPHDBConnectionError, client.recv)
+
+        client.close_socket()
+        self.stop_server()
+
+
+class PySAPHDBTLSConnectionTest(SAPHDBServerTestCase):
+
+    server_cls = SAPHDBTLSTestServer
+
+    def setUp(self):
+        SAPHDBTLSConnection._tls_contexts.clear()
+        SAPHDBTLSConnection._tls_sessions.clear()
+
+    def connect_initialize(self, client):
         client.connect()
         client.initialize()
+        session_reused = client._stream_socket.ins.session_reused
+        client.close_socket()
+        return session_reused
+
+    def test_saphdbtlsconnection_session(self):
+        """Test HDB TLS Connection sessions are resumed when reconnecting to the server"""
+        self.start_server(self.test_address, self.test_port, SAPHDBServerTestHandler)
+
+        self.assertFalse(self.connect_initialize(SAPHDBTLSConnection(self.test_address, self.test_port,
+                                                                     tls_cert_trust=True)))
+        self.assertEqual(1, len(SAPHDBTLSConnection._tls_sessions))
+        self.assertTrue(self.connect_initialize(SAPHDBTLSConnection(self.test_address, self.test_port,
+                                                                    tls_cert_trust=True)))
+
+        # Sessions are not shared across connections with different TLS parameters
+        self.assertFalse(self.connect_initialize(SAPHDBTLSConnection(self.test_address, self.test_port,
+                                                                     tls_cert_trust=True,
+                                                                     tls_ciphers="AES256-GCM-SHA384")))
+        self.assertEqual(2, len(SAPHDBTLSConnection._tls_sessions))
+
+        self.stop_server()
+
+    def test_saphdbtlsconnection_session_no_ticket(self):
+        """Test HDB TLS Connection sessions are not stored when the server doesn't send TLS 1.3 tickets"""
+        self.start_server(self.test_address, self.test_port, SAPHDBServerTestHandler)
+        self.server.context.num_tickets = 0
+
+        client = SAPHDBTLSConnection(self.test_address, self.test_port, tls_cert_trust=True)
+        client.connect()
+        client.initialize()
+        self.assertEqual("TLSv1.3", client._stream_socket.ins.version())
+        client.close_socket()
+        self.assertEqual(0, len(SAPHDBTLSConnection._tls_sessions))
+
+        self.stop_server()
+
+    def test_saphdbtlsconnection_async_close(self):
+        """Test HDB Asynchronous TLS Connection waits for the stream to be closed"""
+        self.start_server(self.test_address, self.test_port, SAPHDBServerTestHandler)
+
+        async def initialize_close():
+            client = SAPHDBAsyncTLSConnection(self.test_address, self.test_port, tls_cert_trust=True)
+            await client.connect()
+            await client.initialize()
+            transport = client._writer.transport
+            await client.close_socket()
+            self.assertFalse(client.is_connected())
+            return transport
+        transport = asyncio.run(initialize_close())
+        self.assertTrue(transport.is_closing())
+        self.assertIsNone(transport.get_extra_info("socket"))
+
+        self.stop_server()
+
+    def test_saphdbtlsconnection_session_evicted_context(self):
+        """Test HDB TLS Connection sessions are not resumed with a context created after evicting theirs"""
+        class SAPHDBTLSConnectionSmallCache(SAPHDBTLSConnection):
+            TLS_CONTEXTS_CACHE_SIZE = 1
+
+        def connect_initialize(tls_ciphers=None):
+            return self.connect_initialize(SAPHDBTLSConnectionSmallCache(self.test_address, self.test_port,
+                                                                         tls_cert_trust=True,
+                                                                         tls_ciphers=tls_ciphers))
+
+        self.start_server(self.test_address, self.test_port, SAPHDBServerTestHandler)
+
+        self.assertFalse(connect_initialize())
+        context = SAPHDBTLSConnectionSmallCache(self.test_address, self.test_port, tls_cert_trust=True).get_tls_context()
+
+        # Evict the context from the cache, the session established with it is kept
+        self.assertFalse(connect_initialize("AES256-GCM-SHA384"))
+        self.assertEqual(1, len(SAPHDBTLSConnection._tls_contexts))
+        self.assertEqual(2, len(SAPHDBTLSConnection._tls_sessions))
+
+        # A new context is created, so the session is established again instead of resumed
+        self.assertFalse(connect_initialize())
+        self.assertIsNot(context, SAPHDBTLSConnectionSmallCache(self.test_address, self.test_port,
+                                                                tls_cert_trust=True).get_tls_context())
+        self.assertTrue(connect_initialize())
+
+        self.stop_server()
+
+    def test_saphdbtlsconnection_context(self):
+        """Test HDB TLS Connection contexts are shared across connections with the same TLS parameters"""
+        client = SAPHDBTLSConnection("127.0.0.1", 30017, tls_cert_trust=True)
+        context = client.get_tls_context()
+        self.assertEqual(ssl.CERT_NONE, context.verify_mode)
+        self.assertFalse(context.check_hostname)
+        self.assertEqual(ssl.PROTOCOL_TLS_CLIENT, context.protocol)
+
+        self.assertIs(context, SAPHDBTLSConnection("127.0.0.2", 30015, tls_cert_trust=True).get_tls_context())
+        self.assertIs(context, SAPHDBAsyncTLSConnection("127.0.0.1", 30017, tls_cert_trust=True).get_tls_context())
+        self.assertIsNot(context, SAPHDBTLSConnection("127.0.0.1", 30017).get_tls_context())
+        self.assertEqual(ssl.CERT_REQUIRED, SAPHDBTLSConnection("127.0.0.1", 30017).get_tls_context().verify_mode)
+
+    def test_saphdbtlsconnection_context_cache(self):
+        """Test HDB TLS Connection contexts cache evicts the least recently used contexts"""
+        context = SAPHDBTLSConnection("127.0.0.1", 30017, tls_cert_trust=True).get_tls_context()
+        for ciphers in range(SAPHDBTLSConnection.TLS_CONTEXTS_CACHE_SIZE - 1):
+            SAPHDBTLSConnection("127.0.0.1", 30017, tls_cert_trust=True,
+                                tls_ciphers="AES256-GCM-SHA384:" * (ciphers + 1)).get_tls_context()
+            # Keep the first context as the most recently used one
+            self.assertIs(context, SAPHDBTLSConnection("127.0.0.1", 30017, tls_cert_trust=True).get_tls_context())
+        self.assertEqual(SAPHDBTLSConnection.TLS_CONTEXTS_CACHE_SIZE, len(SAPHDBTLSConnection._tls_contexts))
+
+        SAPHDBTLSConnection("127.0.0.1", 30017, tls_cert_trust=True, tls_ciphers="AES256-CCM8").get_tls_context()
+        self.assertEqual(SAPHDBTLSConnection.TLS_CONTEXTS_CACHE_SIZE, len(SAPHDBTLSConnection._tls_contexts))
+        self.assertIs(context, SAPHDBTLSConnection("127.0.0.1", 30017, tls_cert_trust=True).get_tls_context())
+
+
+class PySAPHDBAsyncConnectionTest(PySAPHDBConnectionTest):
+
+    def test_saphdbconnection_initialize(self):
+        """Test HDB Asynchronous Connection initialize"""
+        self.start_server(self.test_address, self.test_port, SAPHDBServerJWTAuthTestHandler)
+
+        async def initialize():
+            client = SAPHDBAsyncConnection(self.test_address, self.test_port)
+            await client.connect()
+            await client.initialize()
+            await client.close_socket()
+            return client
+        client = asyncio.run(initialize())
+        self.assertEqual(4, client.product_version)
+        self.assertEqual(4, client.protocol_version)
+
+        self.stop_server()
+
+    def test_saphdbconnection_connect_timeout(self):
+        """Test HDB Asynchronous Connection timeout when connecting"""
+        self.start_server(self.test_address, self.test_port, SAPHDBServerJWTAuthTestHandler)
+
+        client = SAPHDBAsyncConnection(self.test_address, self.test_port)
+        self.assertRaises(SAPHDBConnectionError, asyncio.run, client.connect(timeout=0))
+        self.assertFalse(client.is_connected())
+
+        self.stop_server()
+
+    def test_saphdbconnection_authenticate(self):
+        """Test HDB Asynchronous Connection authentication"""
+        self.start_server(self.test_address, self.test_port, SAPHDBServerJWTAuthTestHandler)
+
+        async def connect_authenticate():
+            clients = [SAPHDBAsyncConnection(self.test_address, self.test_port, SAPHDBAuthJWTMethod("username", "jwt"))
+                       for _ in range(3)]
+            await asyncio.gather(*[client.connect_authenticate() for client in clients])
+            for client in clients:
+                await client.close_socket()
+            return clients
+        for client in asyncio.run(connect_authenticate()):
+            self.assertEqual(b"cookie", client.auth_method.session_cookie)
+
+        self.stop_server()
+
+    def test_saphdbconnection_not_connected(self):
+        """Test HDB Asynchronous Connection methods requiring a connection"""
+        client = SAPHDBAsyncConnection(self.test_address, self.test_port)
+        for coroutine in [client.send(SAPHDB()), client.sr(SAPHDB()), client.recv(), client.recv_raw(),
+                          client.initialize(), client.authenticate()]:
+            self.assertRaises(SAPHDBConnectionError, asyncio.run, coroutine)
+
+    def check_saphdbconnection_recv(self, handler_cls):
+        self.start_server(self.test_address, self.test_port, handler_cls)
+
+        async def recv():
+            client = SAPHDBAsyncConnection(self.test_address, self.test_port)
+            await client.connect()
+            reply = await client.recv()
+            # The server closed the connection after the reply
+            with self.assertRaises(SAPHDBConnectionError):
+                await client.recv()
+            await client.close_socket()
+            return reply
+        reply = asyncio.run(recv())
+
+        self.assertEqual(bytes(SAPHDBServerReplyTestHandler.reply), bytes(reply))
+        self.assertEqual(1, reply.noofsegm)
+        self.assertEqual(18, reply.segments[0].functioncode)
 
         self.stop_server()
 